@@ -25,9 +25,9 @@ class Command(BaseCommand):
         )
 
     def fetch_tasks(self, msg: Message, tg_user: TgUser):
-        gls = Goal.objects.filter(user=tg_user.user)
-        if gls.count() > 0:
-            resp_msg = [f"#{item.id} {item.title}" for item in gls]
+        gls = Goal.objects.visible_to(tg_user.user).filter(user=tg_user.user).values_list("id", "title")
+        if gls:
+            resp_msg = [f"#{goal_id} {title}" for goal_id, title in gls]
             self.tg_client.send_message(msg.chat.id, "\n".join(resp_msg))
         else:
             self.tg_client.send_message(msg.chat.id, "Ваш список целей пуст")
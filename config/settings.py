@@ -81,6 +81,47 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 DATABASES = {"default": env.db()}
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+# locmem только для разработки и тестов: при нескольких процессах нужен общий кэш (check --deploy)
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# Время жизни кэша участия пользователя в досках, секунды
+GOALS_MEMBERSHIP_CACHE_TIMEOUT = env.int("GOALS_MEMBERSHIP_CACHE_TIMEOUT", default=300)
+
+# Время жизни кэша ответов списков, секунды; 0 выключает кэш
+GOALS_RESPONSE_CACHE_TIMEOUT = env.int("GOALS_RESPONSE_CACHE_TIMEOUT", default=300)
+
+# Автодополнение: число результатов по умолчанию и максимум, бюджет времени в мс, время жизни кэша в секундах
+GOALS_AUTOCOMPLETE_LIMIT = env.int("GOALS_AUTOCOMPLETE_LIMIT", default=10)
+GOALS_AUTOCOMPLETE_MAX_LIMIT = env.int("GOALS_AUTOCOMPLETE_MAX_LIMIT", default=50)
+GOALS_AUTOCOMPLETE_BUDGET_MS = env.int("GOALS_AUTOCOMPLETE_BUDGET_MS", default=150)
+GOALS_AUTOCOMPLETE_CACHE_TIMEOUT = env.int("GOALS_AUTOCOMPLETE_CACHE_TIMEOUT", default=60)
+
+# Максимум целей в одном запросе массовых операций
+GOALS_BULK_MAX_ITEMS = env.int("GOALS_BULK_MAX_ITEMS", default=1000)
+
+# Архивирование целей удаленных досок и категорий: размер пачки
+# и число пачек, которые выполняются сразу в запросе на удаление
+GOALS_ARCHIVE_BATCH_SIZE = env.int("GOALS_ARCHIVE_BATCH_SIZE", default=1000)
+GOALS_ARCHIVE_INLINE_BATCHES = env.int("GOALS_ARCHIVE_INLINE_BATCHES", default=1)
+
+# Синхронизация: максимум объектов каждого типа в ответе и задержка в секундах между последней
+# записью транзакции и ее коммитом (импорт и архивирование ставят updated перед самым коммитом)
+GOALS_SYNC_LIMIT = env.int("GOALS_SYNC_LIMIT", default=500)
+GOALS_SYNC_LAG = env.float("GOALS_SYNC_LAG", default=1)
+
+# Экспорт целей: сколько строк читается из курсора базы за раз
+GOALS_EXPORT_CHUNK_SIZE = env.int("GOALS_EXPORT_CHUNK_SIZE", default=2000)
+
+# Импорт целей: строк в одной транзакции и ошибок строк в ответе (остальные только считаются)
+GOALS_IMPORT_BATCH_SIZE = env.int("GOALS_IMPORT_BATCH_SIZE", default=1000)
+GOALS_IMPORT_MAX_ERRORS = env.int("GOALS_IMPORT_MAX_ERRORS", default=100)
+
+# Снимок доски: максимум строк в каждом разделе
+GOALS_SNAPSHOT_LIMIT = env.int("GOALS_SNAPSHOT_LIMIT", default=500)
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
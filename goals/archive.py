@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from goals.cache import invalidate_board_data
+from goals.counters import lock_goals, move_deltas
+from goals.models import Goal, GoalArchiveJob, GoalCounter
+
+
+def run_archive_job(job_id, max_batches=None, batch_size=None) -> bool:
+    """
+    Архивирует цели задания пачками, каждая пачка в своей транзакции вместе с прогрессом.
+    Возвращает True, когда задание завершено
+    """
+    batch_size = batch_size or settings.GOALS_ARCHIVE_BATCH_SIZE
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            job = GoalArchiveJob.objects.select_for_update(skip_locked=True).filter(
+                pk=job_id, is_done=False
+            ).first()
+            if job is None:
+                return not GoalArchiveJob.objects.filter(pk=job_id, is_done=False).exists()
+
+            ids = list(
+                job.goals()
+                .filter(id__gt=job.last_goal_id)
+                .exclude(status=Goal.Status.archived)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if ids:
+                goals = lock_goals(Goal.objects.filter(id__in=ids))
+                deltas = move_deltas(goals, status=Goal.Status.archived)
+                GoalCounter.apply(deltas)
+                invalidate_board_data(key[0] for key in deltas)
+                job.last_goal_id = ids[-1]
+            job.is_done = len(ids) < batch_size
+            job.save()
+            if ids:
+                # последним шагом перед коммитом, см. goals.sync.stamp_before_commit
+                goals.update(status=Goal.Status.archived, updated=timezone.now(), version=F("version") + 1)
+        batches += 1
+        if job.is_done:
+            return True
+    return False
+
+
+def start_archive_job(board=None, category=None) -> GoalArchiveJob:
+    """
+    Создает задание архивирования и выполняет первые пачки сразу после коммита
+    """
+    job = GoalArchiveJob(board=board, category=category)
+    job.save()
+    transaction.on_commit(
+        lambda: run_archive_job(job.id, max_batches=settings.GOALS_ARCHIVE_INLINE_BATCHES)
+    )
+    return job
+
+
+def run_pending_jobs(batch_size=None) -> int:
+    """
+    Доделывает незавершенные задания, в том числе прерванные падением процесса
+    """
+    done = 0
+    for job_id in GoalArchiveJob.objects.filter(is_done=False).order_by("id").values_list("id", flat=True):
+        done += run_archive_job(job_id, batch_size=batch_size)
+    return done
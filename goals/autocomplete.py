@@ -0,0 +1,183 @@
+import hashlib
+import json
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from goals.cache import get_versions
+from goals.models import GoalCategory, Goal
+
+# доля триграмм запроса, которые должны найтись в заголовке, как pg_trgm.word_similarity_threshold
+SIMILARITY_THRESHOLD = 0.5
+
+SOURCES = {
+    "categories": ("id", "title", "board_id"),
+    "goals": ("id", "title", "board_id", "category_id"),
+}
+
+
+def normalize(query) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def get_sources(board_ids) -> dict:
+    """
+    Категории и цели, из которых выбирает автодополнение: живые объекты досок пользователя
+    """
+    return {
+        "categories": GoalCategory.objects.filter(board_id__in=board_ids, is_deleted=False),
+        "goals": Goal.objects.filter(board_id__in=board_ids, category__is_deleted=False).exclude(
+            status=Goal.Status.archived
+        ),
+    }
+
+
+def to_item(row) -> dict:
+    item = {"id": row["id"], "title": row["title"], "board": row["board_id"]}
+    if "category_id" in row:
+        item["category"] = row["category_id"]
+    return item
+
+
+def trigrams(text) -> set:
+    """
+    Триграммы слов как в pg_trgm: слово дополняется двумя пробелами слева и одним справа
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Индекс триграмм заголовков в памяти. Совпадение считается как доля триграмм запроса,
+    найденных в заголовке, поэтому недописанное слово и опечатка в одной букве тоже находятся
+    """
+    def __init__(self, rows):
+        self.rows = rows
+        self.titles = [normalize(row["title"]) for row in rows]
+        self.postings = defaultdict(list)
+        for position, title in enumerate(self.titles):
+            for gram in trigrams(title):
+                self.postings[gram].append(position)
+
+    def search(self, query, limit, deadline) -> tuple:
+        """
+        Лучшие limit строк и признак того, что поиск прерван по времени
+        """
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            if time.monotonic() > deadline:
+                return [], True
+            shared.update(self.postings.get(gram, ()))
+
+        scored = []
+        for position, count in shared.items():
+            similarity = count / len(grams)
+            is_prefix = self.titles[position].startswith(query)
+            if is_prefix or similarity >= SIMILARITY_THRESHOLD:
+                scored.append((not is_prefix, -similarity, self.titles[position], self.rows[position]["id"], position))
+        scored.sort()
+        return [self.rows[position] for *_, position in scored[:limit]], False
+
+
+class MemoryAutocomplete:
+    """
+    Запасной вариант для SQLite: индекс триграмм строится по объектам досок
+    и кэшируется, пока не изменится версия данных одной из досок
+    """
+    def get_index(self, name, queryset, versions) -> TrigramIndex:
+        digest = hashlib.md5(json.dumps(sorted(versions.items())).encode()).hexdigest()
+        key = f"goals:autocomplete:index:{name}:{digest}"
+        index = cache.get(key)
+        if index is None:
+            index = TrigramIndex(list(queryset.values(*SOURCES[name])))
+            cache.set(key, index, timeout=settings.GOALS_AUTOCOMPLETE_CACHE_TIMEOUT)
+        return index
+
+    def complete(self, board_ids, versions, query, limit, deadline) -> dict:
+        result = {"partial": False}
+        for name, queryset in get_sources(board_ids).items():
+            rows, partial = self.get_index(name, queryset, versions).search(query, limit, deadline)
+            result[name] = [to_item(row) for row in rows]
+            result["partial"] = result["partial"] or partial
+        return result
+
+
+class PostgresAutocomplete:
+    """
+    ILIKE 'q%' и оператор <% из pg_trgm, оба используют GIN индексы триграмм (миграция 0015).
+    Остаток бюджета времени ставится в statement_timeout каждого запроса
+    """
+    def find(self, name, queryset, query, limit) -> list:
+        column = f'"{queryset.model._meta.db_table}"."title"'
+        pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return list(
+            queryset.filter(RawSQL(f"({column} ILIKE %s OR %s <%% {column})", (pattern, query),
+                                   output_field=BooleanField()))
+            .annotate(
+                is_prefix=RawSQL(f"{column} ILIKE %s", (pattern,), output_field=BooleanField()),
+                similarity=RawSQL(f"word_similarity(%s, {column})", (query,), output_field=FloatField()),
+            )
+            .order_by("-is_prefix", "-similarity", "title", "id")
+            .values(*SOURCES[name])[:limit]
+        )
+
+    def complete(self, board_ids, versions, query, limit, deadline) -> dict:
+        result = {"partial": False}
+        for name, queryset in get_sources(board_ids).items():
+            remaining = int((deadline - time.monotonic()) * 1000)
+            rows = []
+            if remaining <= 0:
+                result["partial"] = True
+                result[name] = []
+                continue
+            try:
+                with transaction.atomic():
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            "SELECT set_config('statement_timeout', %s, true), "
+                            "set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                            (str(remaining), str(SIMILARITY_THRESHOLD)),
+                        )
+                    rows = self.find(name, queryset, query, limit)
+            except OperationalError:
+                result["partial"] = True
+            result[name] = [to_item(row) for row in rows]
+        return result
+
+
+AUTOCOMPLETE_BACKENDS = {
+    "postgresql": PostgresAutocomplete(),
+}
+MEMORY_AUTOCOMPLETE = MemoryAutocomplete()
+
+
+def autocomplete(user_id, board_ids, query, limit) -> dict:
+    """
+    Лучшие limit категорий и целей досок board_ids по началу или похожести заголовка.
+    Ответы кэшируются для пользователя по запросу и версиям данных досок,
+    неполные ответы, прерванные бюджетом GOALS_AUTOCOMPLETE_BUDGET_MS, не кэшируются
+    """
+    query = normalize(query)
+    versions = get_versions("board_data", board_ids)
+    digest = hashlib.md5(json.dumps([query, limit, sorted(versions.items())]).encode()).hexdigest()
+    key = f"goals:autocomplete:{user_id}:{digest}"
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    deadline = time.monotonic() + settings.GOALS_AUTOCOMPLETE_BUDGET_MS / 1000
+    backend = AUTOCOMPLETE_BACKENDS.get(connection.vendor, MEMORY_AUTOCOMPLETE)
+    result = backend.complete(board_ids, versions, query, limit, deadline)
+    if not result["partial"]:
+        cache.set(key, result, timeout=settings.GOALS_AUTOCOMPLETE_CACHE_TIMEOUT)
+    return result
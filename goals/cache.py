@@ -0,0 +1,83 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from goals.models import BoardParticipant
+
+
+def _version_key(kind, obj_id):
+    return f"goals:version:{kind}:{obj_id}"
+
+
+def get_versions(kind, ids) -> dict:
+    """
+    Текущие версии объектов вида {id: version}.
+    Отсутствующие версии создаются заново от текущего времени, чтобы не совпасть с вытесненными
+    """
+    keys = {_version_key(kind, obj_id): obj_id for obj_id in ids}
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    for key, version in missing.items():
+        cache.add(key, version, timeout=None)
+    found.update(cache.get_many(missing) if missing else {})
+    return {obj_id: found.get(key) for key, obj_id in keys.items()}
+
+
+def bump_versions(kind, ids):
+    for obj_id in ids:
+        key = _version_key(kind, obj_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def load_memberships(user_id) -> dict:
+    """
+    Роли пользователя в досках {board_id: role} из кэша или из базы.
+    Запись в кэше действительна, пока не изменились версии пользователя и его досок
+    """
+    user_version = get_versions("user", [user_id])[user_id]
+    key = f"goals:membership:{user_id}:{user_version}"
+    entry = cache.get(key)
+    if entry is not None:
+        roles, board_versions = entry
+        if get_versions("board", roles) == board_versions:
+            return roles
+
+    roles = dict(BoardParticipant.objects.filter(user_id=user_id).values_list("board_id", "role"))
+    cache.set(key, (roles, get_versions("board", roles)), timeout=settings.GOALS_MEMBERSHIP_CACHE_TIMEOUT)
+    return roles
+
+
+def invalidate_memberships(user_ids=(), board_ids=()):
+    """
+    Сбрасывает кэш участия для пользователей и досок.
+    Повторный сброс после коммита не дает параллельному чтению закэшировать старые данные
+    """
+    user_ids, board_ids = list(user_ids), list(board_ids)
+
+    def bump():
+        bump_versions("user", user_ids)
+        bump_versions("board", board_ids)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def invalidate_board_data(board_ids):
+    """
+    Сбрасывает закэшированные ответы списков, в которые входят эти доски.
+    Как и для участия, версия повышается сразу и еще раз после коммита
+    """
+    board_ids = sorted({board_id for board_id in board_ids if board_id is not None})
+    if not board_ids:
+        return
+
+    def bump():
+        bump_versions("board_data", board_ids)
+
+    bump()
+    transaction.on_commit(bump)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Роли, ответы списков и их версии сбрасываются в кэше, поэтому он должен быть общим
+    для всех процессов api и archiver, иначе другие процессы отдают устаревшие данные
+    """
+    if settings.CACHES["default"]["BACKEND"] in LOCAL_CACHES:
+        return [Error(
+            "Кэш по умолчанию локален для процесса",
+            hint="Задайте CACHE_URL общего кэша, например redis://redis:6379/0",
+            id="goals.E001",
+        )]
+    return []
@@ -0,0 +1,136 @@
+import hashlib
+import json
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from goals.roles import get_board_roles
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "Объект изменен другим запросом, загрузите его заново"
+    default_code = "precondition_failed"
+
+
+def make_etag(*parts) -> str:
+    return quote_etag(hashlib.md5(json.dumps(parts, default=str).encode()).hexdigest())
+
+
+def not_modified(request, etag, last_modified):
+    """
+    304 при совпадении If-None-Match или, без него, If-Modified-Since; иначе None
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(getattr(request, "_request", request), etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    # ответы зависят от пользователя, клиент должен перепроверять их по ETag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalRetrieveMixin:
+    """
+    Сильный ETag и Last-Modified объекта из полей updated и version.
+    При совпадении условий запроса 304 отдается без вызова сериализатора
+    """
+    def get_object_etag(self, instance) -> str:
+        return make_etag(
+            instance._meta.label, instance.pk, instance.updated.isoformat(), getattr(instance, "version", None)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = self.get_object_etag(instance)
+        response = not_modified(request, etag, instance.updated)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return set_validators(response, etag, instance.updated)
+
+
+class ConditionalListMixin:
+    """
+    ETag списка из одного агрегата (max(updated), count) по видимым строкам после фильтров,
+    параметров запроса и ролей пользователя. Строки при этом не читаются и не сериализуются
+    """
+    def filter_queryset(self, queryset):
+        # фильтры нужны и агрегату, и самому списку; проверка их значений в базе выполняется один раз
+        if not hasattr(self, "_filtered_queryset"):
+            self._filtered_queryset = super().filter_queryset(queryset)
+        return self._filtered_queryset
+
+    def get_list_etag(self, queryset) -> str:
+        aggregate = queryset.order_by().aggregate(last_modified=Max("updated"), count=Count("pk"))
+        params = sorted((key, sorted(values)) for key, values in self.request.query_params.lists())
+        roles = sorted(get_board_roles(self.request).roles.items())
+        return make_etag(self.request.path, params, roles, aggregate["last_modified"], aggregate["count"])
+
+    def list(self, request, *args, **kwargs):
+        # без Last-Modified: удаление строки не увеличивает max(updated), а If-Modified-Since
+        # вернул бы 304 на устаревший список. Число строк в ETag удаление замечает
+        etag = self.get_list_etag(self.filter_queryset(self.get_queryset()))
+        response = not_modified(request, etag, None)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag, None)
+
+
+class VersionedUpdateMixin(ConditionalRetrieveMixin):
+    """
+    Оптимистичная блокировка изменений. Ожидаемая версия берется из If-Match с ETag объекта
+    или из поля version в теле запроса, и перед записью строка проверяется UPDATE ... WHERE version = ?.
+    Если объект успели изменить, ответ 412 и ничего не записывается.
+    Без If-Match и version изменение безусловное, как раньше
+    """
+    version_field = "version"
+
+    def get_expected_version(self, instance):
+        if_match = parse_etags(self.request.META.get("HTTP_IF_MATCH", ""))
+        if if_match and "*" not in if_match and self.get_object_etag(instance) not in if_match:
+            raise PreconditionFailed
+        if if_match:
+            return instance.version
+
+        version = self.request.data.get(self.version_field)
+        if version is None:
+            return None
+        try:
+            version = int(version)
+        except (TypeError, ValueError):
+            raise ValidationError({self.version_field: ["Версия должна быть целым числом"]})
+        if version != instance.version:
+            raise PreconditionFailed
+        return version
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        expected_version = self.get_expected_version(instance)
+        if expected_version is None:
+            serializer.save()
+        else:
+            with transaction.atomic():
+                # UPDATE ... WHERE version = ? проверяет версию и блокирует строку до конца транзакции
+                updated = type(instance).objects.filter(pk=instance.pk, version=expected_version).update(
+                    version=expected_version
+                )
+                if not updated:
+                    raise PreconditionFailed
+                instance.expected_version = expected_version
+                serializer.save()
+        self.updated_instance = instance
+
+    def update(self, request, *args, **kwargs):
+        # новый ETag в ответе позволяет клиенту сразу отправить следующее изменение с If-Match
+        response = super().update(request, *args, **kwargs)
+        instance = self.updated_instance
+        return set_validators(response, self.get_object_etag(instance), instance.updated)
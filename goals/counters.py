@@ -0,0 +1,115 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from goals.models import Board, GoalCategory, Goal, GoalCounter, COUNTER_FIELDS
+
+OPEN_STATUSES = (Goal.Status.to_do, Goal.Status.in_progress)
+
+
+def count_goals(goals) -> Counter:
+    return Counter(goal.counter_key() for goal in goals)
+
+
+def count_queryset(queryset) -> Counter:
+    return Counter({
+        tuple(row[:-1]): row[-1]
+        for row in queryset.order_by().values_list(*COUNTER_FIELDS).annotate(count=Count("id"))
+    })
+
+
+def lock_goals(queryset):
+    """
+    Блокирует цели queryset по возрастанию id до конца транзакции и возвращает их по id.
+    Пока строки заблокированы, параллельная запись не сдвинет счетчики между move_deltas и update
+    """
+    ids = list(
+        Goal.objects.select_for_update().filter(id__in=queryset.values("id")).order_by("id").values_list(
+            "id", flat=True
+        )
+    )
+    return Goal.objects.filter(id__in=ids)
+
+
+def move_deltas(queryset, **changes) -> Counter:
+    """
+    Изменения счетчиков для queryset.update(**changes), считаются до обновления
+    по заблокированным строкам (lock_goals)
+    """
+    positions = {name: COUNTER_FIELDS.index(name) for name in changes if name in COUNTER_FIELDS}
+    deltas = Counter()
+    for key, count in count_queryset(queryset).items():
+        new = list(key)
+        for name, position in positions.items():
+            new[position] = changes[name]
+        deltas[key] -= count
+        deltas[tuple(new)] += count
+    return deltas
+
+
+def find_drift(board_id) -> dict:
+    """
+    Расхождения {ключ: (в счетчике, на самом деле)} по одной доске
+    """
+    actual = count_queryset(Goal.objects.filter(board_id=board_id))
+    stored = {
+        tuple(row[:-1]): row[-1]
+        for row in GoalCounter.objects.filter(board_id=board_id).values_list(*COUNTER_FIELDS, "count")
+    }
+    return {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in stored.keys() | actual.keys()
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+
+
+def repair_board(board_id) -> dict:
+    """
+    Пересчитывает счетчики доски и исправляет расхождения.
+    Строки счетчиков блокируются, чтобы параллельные изменения целей дождались исправления
+    """
+    with transaction.atomic():
+        list(GoalCounter.objects.select_for_update().filter(board_id=board_id).values_list("id", flat=True))
+        drift = find_drift(board_id)
+        GoalCounter.apply({key: actual - stored for key, (stored, actual) in drift.items()})
+        GoalCounter.objects.filter(board_id=board_id, count=0).delete()
+    return drift
+
+
+def empty_summary() -> dict:
+    return {
+        "total": 0,
+        "overdue": 0,
+        "status": {status: 0 for status in Goal.Status.values},
+        "priority": {priority: 0 for priority in Goal.Priority.values},
+    }
+
+
+def build_summary(board_id):
+    """
+    Число целей доски и ее живых категорий по статусам и приоритетам и число просроченных
+    открытых целей. Считается по строкам GoalCounter без чтения целей
+    """
+    if not Board.objects.filter(pk=board_id, is_deleted=False).exists():
+        return None
+    categories = {
+        category["id"]: {**category, **empty_summary()}
+        for category in GoalCategory.objects.filter(board_id=board_id, is_deleted=False).order_by(
+            "title", "id"
+        ).values("id", "title")
+    }
+    board = empty_summary()
+    today = timezone.localdate()
+    counters = GoalCounter.objects.filter(board_id=board_id, category_id__in=list(categories), count__gt=0)
+    for category_id, status, priority, due_date, count in counters.values_list(
+        "category_id", "status", "priority", "due_date", "count"
+    ):
+        overdue = count if status in OPEN_STATUSES and due_date is not None and due_date < today else 0
+        for summary in (board, categories[category_id]):
+            summary["total"] += count
+            summary["overdue"] += overdue
+            summary["status"][status] += count
+            summary["priority"][priority] += count
+    return {"board": board, "categories": list(categories.values())}
@@ -0,0 +1,85 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from goals.models import GoalComment
+
+GOAL_COLUMNS = (
+    "id", "board", "category", "category_title", "user", "username",
+    "title", "description", "due_date", "status", "priority", "created", "updated",
+)
+CSV_COLUMNS = GOAL_COLUMNS + ("comments",)
+
+
+def goal_rows(goals, chunk_size=None):
+    """
+    Плоские строки целей с вложенными комментариями.
+    Цели и комментарии читаются двумя курсорами в порядке id цели и сливаются по ходу чтения
+    """
+    chunk_size = chunk_size or settings.GOALS_EXPORT_CHUNK_SIZE
+    goals = goals.order_by("id")
+    goal_iter = goals.values(
+        "id", "board_id", "category_id", "user_id", "title", "description", "due_date", "status", "priority",
+        "created", "updated",
+        category_title=F("category__title"),
+        username=F("user__username"),
+    ).iterator(chunk_size=chunk_size)
+    comment_iter = GoalComment.objects.filter(goal_id__in=goals.values("id")).order_by("goal_id", "id").values(
+        "id", "goal_id", "text", "created", username=F("user__username"),
+    ).iterator(chunk_size=chunk_size)
+
+    pending = next(comment_iter, None)
+    for goal in goal_iter:
+        goal["board"] = goal.pop("board_id")
+        goal["category"] = goal.pop("category_id")
+        goal["user"] = goal.pop("user_id")
+        row = {column: goal[column] for column in GOAL_COLUMNS}
+        row["comments"] = []
+        while pending is not None and pending["goal_id"] < goal["id"]:
+            pending = next(comment_iter, None)
+        while pending is not None and pending["goal_id"] == goal["id"]:
+            row["comments"].append({
+                "id": pending["id"],
+                "username": pending["username"],
+                "text": pending["text"],
+                "created": pending["created"],
+            })
+            pending = next(comment_iter, None)
+        yield row
+
+
+def to_json(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield to_json(row) + "\n"
+
+
+class _Echo:
+    """
+    Буфер для csv.writer, который сразу возвращает записанную строку
+    """
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        row = {**row, "comments": to_json(row["comments"])}
+        yield writer.writerow([
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in (row[column] for column in CSV_COLUMNS)
+        ])
+
+
+EXPORT_FORMATS = {
+    "ndjson": (ndjson_lines, "application/x-ndjson"),
+    "csv": (csv_lines, "text/csv"),
+}
@@ -1,16 +1,20 @@
 import django_filters
 from django.db import models
 from django_filters import rest_framework
+from rest_framework.filters import BaseFilterBackend
 
 from goals.models import Goal
+from goals.search import filter_goals
 
 
 class GoalDateFilter(rest_framework.FilterSet):
+    board = django_filters.NumberFilter(field_name="board")
+
     class Meta:
         model = Goal
         fields = {
             "due_date": ("lte", "gte"),
-            # "category": ("exact", "in"),
+            "category": ("exact", "in"),
             "status": ("exact", "in"),
             "priority": ("exact", "in"),
         }
@@ -18,3 +22,24 @@ class GoalDateFilter(rest_framework.FilterSet):
     filter_overrides = {
         models.DateTimeField: {"filter_class": django_filters.IsoDateTimeFilter},
     }
+
+
+class GoalExportFilter(rest_framework.FilterSet):
+    board = django_filters.NumberFilter(field_name="board")
+
+    class Meta:
+        model = Goal
+        fields = ("user",)
+
+
+class GoalSearchFilter(BaseFilterBackend):
+    """
+    Параметр search= по заголовку, описанию и комментариям целей через полнотекстовый индекс
+    """
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "")
+        if not query.strip():
+            return queryset
+        return filter_goals(queryset, query)
@@ -0,0 +1,200 @@
+import csv
+import json
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from goals.cache import invalidate_board_data
+from goals.counters import count_goals
+from goals.models import Board, GoalCategory, Goal, GoalComment, GoalImportJob, GoalCounter
+from goals.roles import BoardRoles
+from goals.serializers import GoalImportRowSerializer
+from goals.sync import stamp_before_commit
+
+
+def ndjson_records(stream):
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+def parse_ndjson(record) -> dict:
+    data = json.loads(record)
+    if not isinstance(data, dict):
+        raise ValueError
+    return data
+
+
+def parse_csv(record) -> dict:
+    data = {key: value for key, value in record.items() if key and value not in ("", None)}
+    if "comments" in data:
+        data["comments"] = json.loads(data["comments"])
+    return data
+
+
+IMPORT_FORMATS = {
+    GoalImportJob.Format.ndjson: (ndjson_records, parse_ndjson),
+    GoalImportJob.Format.csv: (csv.DictReader, parse_csv),
+}
+
+
+class GoalImporter:
+    """
+    Потоковый импорт целей с комментариями.
+    Каждая пачка строк проверяется и вставляется через bulk_create в своей транзакции
+    вместе с прогрессом задания. Категории ищутся по названию в доске и создаются при отсутствии.
+    Дата создания берется из файла, дата обновления - текущая, чтобы изменения увидела синхронизация
+    """
+    def __init__(self, job: GoalImportJob, batch_size=None, on_error=None):
+        self.job = job
+        self.batch_size = batch_size or settings.GOALS_IMPORT_BATCH_SIZE
+        self.on_error = on_error
+        self.roles = BoardRoles(job.user)
+        self.categories = {}
+        # в отчет попадают первые GOALS_IMPORT_MAX_ERRORS ошибок, error_count считает все
+        self.errors = []
+        self.error_count = 0
+
+    def run(self, stream) -> dict:
+        records, parse = IMPORT_FORMATS[self.job.format]
+        started = time.monotonic()
+        rows = 0
+        start_goals, start_comments = self.job.goals_created, self.job.comments_created
+
+        batch, number = [], 0
+        try:
+            for number, record in enumerate(records(stream), start=1):
+                if number <= self.job.rows_done:
+                    continue
+                batch.append((number, record))
+                if len(batch) >= self.batch_size:
+                    rows += self.import_batch(batch, parse)
+                    batch = []
+            rows += self.import_batch(batch, parse)
+        except (UnicodeDecodeError, csv.Error):
+            self.add_error(number + 1, ["Не удалось прочитать файл"])
+        else:
+            self.job.is_done = True
+            self.job.save()
+
+        seconds = time.monotonic() - started
+        return {
+            "job": self.job.id,
+            "is_done": self.job.is_done,
+            "rows": rows,
+            "goals": self.job.goals_created - start_goals,
+            "comments": self.job.comments_created - start_comments,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / seconds) if seconds else rows,
+            "errors": self.errors,
+            "error_count": self.error_count,
+        }
+
+    def add_error(self, number, errors):
+        self.error_count += 1
+        if len(self.errors) < settings.GOALS_IMPORT_MAX_ERRORS:
+            self.errors.append({"row": number, "errors": errors})
+        if self.on_error:
+            self.on_error(number, errors)
+
+    def validate_batch(self, batch, parse) -> list:
+        valid = []
+        for number, record in batch:
+            try:
+                data = parse(record)
+            except ValueError:
+                self.add_error(number, ["Некорректная строка"])
+                continue
+            if self.job.board_id:
+                data["board"] = self.job.board_id
+            row = GoalImportRowSerializer(data=data)
+            if row.is_valid():
+                valid.append((number, row.validated_data))
+            else:
+                self.add_error(number, row.errors)
+
+        deleted = set(Board.objects.filter(
+            id__in={data["board"] for _, data in valid}, is_deleted=True
+        ).values_list("id", flat=True))
+        allowed = []
+        for number, data in valid:
+            if data["board"] in deleted or not self.roles.can_write(data["board"]):
+                self.add_error(number, {"board": ["Вы должны быть владельцем или редактором доски для этого"]})
+            else:
+                allowed.append(data)
+        return allowed
+
+    def resolve_categories(self, rows, now) -> list:
+        """
+        Находит категории строк пачки по доске и названию, недостающие создает. Возвращает созданные
+        """
+        missing = {(data["board"], data["category_title"]) for data in rows} - set(self.categories)
+        if not missing:
+            return []
+        existing = GoalCategory.objects.filter(
+            board_id__in={board_id for board_id, _ in missing},
+            title__in={title for _, title in missing},
+            is_deleted=False,
+        ).order_by("id").values_list("board_id", "title", "id")
+        for board_id, title, category_id in existing:
+            if (board_id, title) in missing:
+                self.categories.setdefault((board_id, title), category_id)
+
+        created = GoalCategory.objects.bulk_create([
+            GoalCategory(board_id=board_id, title=title, user=self.job.user, created=now, updated=now)
+            for board_id, title in sorted(missing - set(self.categories))
+        ])
+        for category in created:
+            self.categories[(category.board_id, category.title)] = category.id
+        return created
+
+    def import_batch(self, batch, parse) -> int:
+        if not batch:
+            return 0
+        errors_before = self.error_count
+        rows = self.validate_batch(batch, parse)
+        now = timezone.now()
+        with transaction.atomic():
+            categories = self.resolve_categories(rows, now)
+            goals = Goal.objects.bulk_create([
+                Goal(
+                    category_id=self.categories[(data["board"], data["category_title"])],
+                    board_id=data["board"],
+                    user=self.job.user,
+                    title=data["title"],
+                    description=data.get("description"),
+                    due_date=data.get("due_date"),
+                    status=data["status"],
+                    priority=data["priority"],
+                    created=data.get("created", now),
+                    updated=now,
+                )
+                for data in rows
+            ])
+            GoalCounter.apply(count_goals(goals))
+            invalidate_board_data(goal.board_id for goal in goals)
+            comments = GoalComment.objects.bulk_create([
+                GoalComment(
+                    goal=goal,
+                    board_id=goal.board_id,
+                    user=self.job.user,
+                    text=comment["text"],
+                    created=comment.get("created", now),
+                    updated=now,
+                )
+                for goal, data in zip(goals, rows)
+                for comment in data.get("comments", [])
+            ])
+            self.job.rows_done = batch[-1][0]
+            self.job.goals_created += len(goals)
+            self.job.comments_created += len(comments)
+            self.job.error_count += self.error_count - errors_before
+            self.job.save()
+            stamp_before_commit(
+                GoalCategory.objects.filter(id__in=[category.id for category in categories]),
+                Goal.objects.filter(id__in=[goal.id for goal in goals]),
+                GoalComment.objects.filter(id__in=[comment.id for comment in comments]),
+            )
+        return len(batch)
@@ -0,0 +1,249 @@
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import renderers, serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from core.models import User
+from core.serializers import UserSerializer
+
+
+def datetime_repr(value):
+    """
+    То же, что DateTimeField.to_representation в формате ISO 8601
+    """
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def date_repr(value):
+    return value.isoformat()
+
+
+PLAIN_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class LeanSerializer:
+    """
+    Быстрое чтение для списков: строки берутся из values(), поля собираются по плану,
+    заранее построенному из полей обычного сериализатора.
+    Результат совпадает с serializer_class(many=True).data для простых полей,
+    дат, первичных ключей и вложенных сериализаторов из таких полей.
+    fields ограничивает поля верхнего уровня, а с ними и колонки запроса.
+    Вложенные объекты из flatten заменяются на <поле>_id в конце строки
+    """
+    def __init__(self, serializer_class, fields=None, flatten=frozenset()):
+        self.fields = fields
+        self.flatten = flatten
+        self.lookups = []
+        self.relations = []
+        self.plan = self.build_plan(serializer_class(), "")
+
+    def add_lookup(self, lookup) -> str:
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return lookup
+
+    def build_plan(self, serializer, prefix) -> tuple:
+        plan, flat = [], []
+        for name, field in serializer.fields.items():
+            if field.write_only or (not prefix and self.fields is not None and name not in self.fields):
+                continue
+            lookup = prefix + field.source.replace(".", "__")
+            if not prefix and name in self.flatten:
+                flat.append((f"{name}_id", self.add_lookup(lookup), None, None))
+            elif isinstance(field, serializers.Serializer):
+                self.relations.append(lookup)
+                plan.append((name, self.add_lookup(lookup), None, self.build_plan(field, lookup + "__")))
+            elif isinstance(field, serializers.DateTimeField):
+                plan.append((name, self.add_lookup(lookup), datetime_repr, None))
+            elif isinstance(field, serializers.DateField):
+                plan.append((name, self.add_lookup(lookup), date_repr, None))
+            elif isinstance(field, PLAIN_FIELDS):
+                plan.append((name, self.add_lookup(lookup), None, None))
+            else:
+                raise ImproperlyConfigured(f"Поле {name} ({type(field).__name__}) не поддерживается")
+        return tuple(plan + flat)
+
+    def values(self, queryset, extra=()):
+        return queryset.values(*self.lookups, *(lookup for lookup in extra if lookup not in self.lookups))
+
+    def build(self, plan, row) -> dict:
+        data = {}
+        for name, lookup, convert, nested in plan:
+            value = row[lookup]
+            if value is None:
+                data[name] = None
+            elif nested is not None:
+                data[name] = self.build(nested, row)
+            elif convert is not None:
+                data[name] = convert(value)
+            else:
+                data[name] = value
+        return data
+
+    def to_representation(self, rows) -> list:
+        plan = self.plan
+        return [self.build(plan, row) for row in rows]
+
+
+_lean_serializers = {}
+
+
+def get_lean_serializer(serializer_class, fields=None, flatten=frozenset()) -> LeanSerializer:
+    key = (serializer_class, fields, flatten)
+    if key not in _lean_serializers:
+        _lean_serializers[key] = LeanSerializer(serializer_class, fields, flatten)
+    return _lean_serializers[key]
+
+
+class LeanJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer без создания кодировщика на каждый ответ.
+    Данные должны состоять только из типов json, как у LeanSerializer
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=renderers.SHORT_SEPARATORS)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = self.encoder.encode(data)
+        return ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+class SparseFieldsMixin:
+    """
+    Параметры fields= и exclude= со списком полей через запятую.
+    Лишние поля убираются и из ответа, и из SELECT через only().
+    С sideload=users строки содержат user_id, а пользователи страницы
+    отдаются одним словарем users, загруженным одним запросом
+    """
+    fields_query_param = "fields"
+    exclude_query_param = "exclude"
+    sideload_query_param = "sideload"
+
+    def get_sparse_fields(self):
+        if hasattr(self, "_sparse_fields"):
+            return self._sparse_fields
+        params = self.request.query_params
+        if self.fields_query_param not in params and self.exclude_query_param not in params:
+            self._sparse_fields = None
+            return None
+
+        available = list(self.get_serializer_class()().fields)
+        selected, errors = None, {}
+        for param in (self.fields_query_param, self.exclude_query_param):
+            names = [name.strip() for name in params.get(param, "").split(",") if name.strip()]
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                errors[param] = [f"Неизвестные поля: {', '.join(unknown)}"]
+            elif names and param == self.fields_query_param:
+                selected = set(names)
+            elif names:
+                selected = (selected or set(available)) - set(names)
+        if errors:
+            raise ValidationError(errors)
+
+        self._sparse_fields = None if selected is None else frozenset(selected)
+        return self._sparse_fields
+
+    def get_sideload(self) -> frozenset:
+        names = {name.strip() for name in self.request.query_params.get(self.sideload_query_param, "").split(",")}
+        names.discard("")
+        if not names:
+            return frozenset()
+        user_field = self.get_serializer_class()().fields.get("user")
+        if names != {"users"} or not isinstance(user_field, serializers.Serializer):
+            raise ValidationError({self.sideload_query_param: ["Поддерживается только users для списков с автором"]})
+        return frozenset({"user"})
+
+    def get_list_lean_serializer(self) -> LeanSerializer:
+        return get_lean_serializer(self.get_serializer_class(), self.get_sparse_fields(), self.get_sideload())
+
+    def get_sideloaded_users(self, rows) -> dict:
+        ids = sorted({row["user_id"] for row in rows if row.get("user_id") is not None})
+        lean = get_lean_serializer(UserSerializer)
+        return {user["id"]: user for user in lean.to_representation(lean.values(User.objects.filter(id__in=ids)))}
+
+    def get_extra_lookups(self) -> list:
+        """
+        Колонки, которые нужны пагинации для курсора, даже если их нет в ответе
+        """
+        return [name.lstrip("-") for name in getattr(self.paginator, "ordering", None) or ()]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fields() is None and not self.get_sideload():
+            return queryset
+        lean = self.get_list_lean_serializer()
+        queryset = queryset.select_related(None)
+        if lean.relations:
+            queryset = queryset.select_related(*lean.relations)
+        return queryset.only("pk", *lean.lookups, *self.get_extra_lookups())
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        child = getattr(serializer, "child", serializer)
+        if fields is not None:
+            for name in list(child.fields):
+                if name not in fields:
+                    child.fields.pop(name)
+        for name in self.get_sideload():
+            if name in child.fields:
+                child.fields.pop(name)
+                child.fields[f"{name}_id"] = serializers.IntegerField(read_only=True)
+        return serializer
+
+
+class LeanListMixin(SparseFieldsMixin):
+    """
+    Список в режиме ?lean=1 собирается LeanSerializer из values() и отдается LeanJSONRenderer.
+    Фильтры, пагинация и выбор полей работают как обычно
+    """
+    lean_query_param = "lean"
+
+    def is_lean(self) -> bool:
+        request = getattr(self, "request", None)
+        return request is not None and request.query_params.get(self.lean_query_param) in ("1", "true")
+
+    def get_renderers(self):
+        if self.is_lean():
+            return [LeanJSONRenderer()]
+        return super().get_renderers()
+
+    def list(self, request, *args, **kwargs):
+        sideload = self.get_sideload()
+        if not self.is_lean() and not sideload:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.is_lean():
+            lean = self.get_list_lean_serializer()
+            queryset = lean.values(queryset, self.get_extra_lookups())
+            serialize = lean.to_representation
+        else:
+            def serialize(rows):
+                return self.get_serializer(rows, many=True).data
+
+        page = self.paginate_queryset(queryset)
+        rows = serialize(queryset if page is None else page)
+        users = self.get_sideloaded_users(rows) if sideload else None
+        if page is not None:
+            response = self.get_paginated_response(rows)
+            if users is not None:
+                response.data["users"] = users
+            return response
+        return Response(rows if users is None else {"results": rows, "users": users})
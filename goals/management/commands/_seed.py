@@ -0,0 +1,98 @@
+import statistics
+import time
+
+from django.utils import timezone
+
+from core.models import User
+from goals.counters import count_goals
+from goals.models import Board, BoardParticipant, GoalCategory, Goal, GoalComment, GoalCounter
+
+
+class Rollback(Exception):
+    """
+    Откат транзакции с тестовыми данными после замеров
+    """
+
+
+def seed(boards=1, participants=1, goals_per_board=100, categories_per_board=3, comments_per_goal=0, prefix="bench"):
+    """
+    Создает пачку досок с участниками, категориями, целями и комментариями.
+    Возвращает пользователя, который участвует во всех досках
+    """
+    now = timezone.now()
+    User.objects.bulk_create([
+        User(username=f"{prefix}_{i}", password="!") for i in range(max(participants, 1))
+    ])
+    users = list(User.objects.filter(username__startswith=f"{prefix}_").order_by("id"))
+    owner = users[0]
+
+    Board.objects.bulk_create([
+        Board(title=f"{prefix} {i}", created=now, updated=now) for i in range(boards)
+    ])
+    board_objs = list(Board.objects.filter(title__startswith=f"{prefix} ").order_by("id"))
+
+    BoardParticipant.objects.bulk_create([
+        BoardParticipant(
+            board=board,
+            user=user,
+            role=BoardParticipant.Role.owner if user == owner else BoardParticipant.Role.writer,
+            created=now,
+            updated=now,
+        )
+        for board in board_objs
+        for user in users
+    ])
+    GoalCategory.objects.bulk_create([
+        GoalCategory(board=board, user=owner, title=f"{prefix} {i}", created=now, updated=now)
+        for board in board_objs
+        for i in range(categories_per_board)
+    ])
+    categories = list(GoalCategory.objects.filter(board__in=board_objs).order_by("id"))
+    by_board = {}
+    for category in categories:
+        by_board.setdefault(category.board_id, []).append(category)
+
+    goals = []
+    for board in board_objs:
+        board_categories = by_board[board.id]
+        for i in range(goals_per_board):
+            goals.append(Goal(
+                category=board_categories[i % len(board_categories)],
+                board=board,
+                user=users[i % len(users)],
+                title=f"{prefix} goal {i}",
+                description=f"{prefix} description {i}",
+                due_date=(now + timezone.timedelta(days=i % 30)).date() if i % 4 else None,
+                status=i % 4 + 1,
+                priority=i % 4 + 1,
+                created=now,
+                updated=now,
+            ))
+    Goal.objects.bulk_create(goals, batch_size=1000)
+    GoalCounter.apply(count_goals(goals))
+
+    if comments_per_goal:
+        GoalComment.objects.bulk_create([
+            GoalComment(
+                goal_id=goal_id, board_id=board_id, user=owner, text=f"{prefix} comment {i}", created=now, updated=now
+            )
+            for goal_id, board_id in Goal.objects.filter(board__in=board_objs).values_list("id", "board_id")
+            for i in range(comments_per_goal)
+        ], batch_size=1000)
+    return owner
+
+
+def measure(func, repeat=5):
+    """
+    Медиана времени выполнения func в миллисекундах
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item]
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management import BaseCommand
+
+from goals.archive import run_pending_jobs
+
+
+class Command(BaseCommand):
+    """
+    Фоновое архивирование целей удаленных досок и категорий.
+    Продолжает задания с сохраненного места после перезапуска
+    """
+    help = "archive goals of deleted boards and categories"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="обработать задания и выйти")
+        parser.add_argument("--interval", type=float, default=5, help="пауза между проверками, секунды")
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            done = run_pending_jobs(batch_size=options["batch_size"])
+            if done:
+                self.stdout.write(f"Завершено заданий: {done}")
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
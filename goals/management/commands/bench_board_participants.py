@@ -0,0 +1,60 @@
+import json
+
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.models import User
+from goals.management.commands._seed import Rollback, seed, measure, int_list
+from goals.models import Board, BoardParticipant
+from goals.views import BoardView
+
+
+class Command(BaseCommand):
+    """
+    Замер синхронизации участников доски через BoardView для разного числа участников.
+    Данные создаются в транзакции и откатываются после замеров
+    """
+    help = "benchmark board participants update"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--participants", type=int_list, default=[10, 100, 300])
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'participants':>13} {'share, ms':>10} {'change, ms':>11} {'queries':>8}")
+        for count in options["participants"]:
+            try:
+                with transaction.atomic():
+                    owner = seed(boards=1, participants=1, goals_per_board=0, prefix="bench_owner")
+                    board = Board.objects.get(participants__user=owner)
+                    User.objects.bulk_create([User(username=f"bench_user_{i}", password="!") for i in range(count)])
+                    usernames = [f"bench_user_{i}" for i in range(count)]
+
+                    writers = [{"user": name, "role": BoardParticipant.Role.writer} for name in usernames]
+                    readers = [
+                        {"user": name, "role": BoardParticipant.Role.reader if i % 2 else BoardParticipant.Role.writer}
+                        for i, name in enumerate(usernames[: count * 3 // 4])
+                    ]
+                    share = measure(lambda: (self.put(owner, board, []), self.put(owner, board, writers)),
+                                    options["repeat"])
+                    change = measure(lambda: (self.put(owner, board, writers), self.put(owner, board, readers)),
+                                     options["repeat"])
+                    with CaptureQueriesContext(connection) as context:
+                        self.put(owner, board, writers)
+                    raise Rollback
+            except Rollback:
+                pass
+            self.stdout.write(f"{count:>13} {share:>10.2f} {change:>11.2f} {len(context.captured_queries):>8}")
+
+    @staticmethod
+    def put(owner, board, participants):
+        request = APIRequestFactory().put(
+            f"/goals/board/{board.pk}",
+            json.dumps({"title": board.title, "participants": participants}),
+            content_type="application/json",
+        )
+        force_authenticate(request, user=owner)
+        response = BoardView.as_view()(request, pk=board.pk)
+        assert response.status_code == 200, response.data
@@ -0,0 +1,59 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from goals.lean import LeanJSONRenderer, get_lean_serializer
+from goals.management.commands._seed import Rollback, seed, measure, int_list
+from goals.models import GoalCategory, Goal, GoalComment, Board
+from goals.serializers import GoalSerializer, CommentSerializer, GoalCategorySerializer, BoardListSerializer
+
+
+class Command(BaseCommand):
+    """
+    Сравнение скорости списков через ModelSerializer и через LeanSerializer, строк в секунду.
+    В замер входят запрос к базе, сборка данных и рендеринг JSON.
+    Данные создаются в транзакции и откатываются после замеров
+    """
+    help = "benchmark regular and lean list serialization"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int_list, default=[100, 1000, 10000])
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'list':>10} {'rows':>7} {'regular, rows/s':>16} {'lean, rows/s':>13} {'speedup':>8}")
+        for rows in options["rows"]:
+            try:
+                with transaction.atomic():
+                    seed(boards=1, participants=3, goals_per_board=rows, categories_per_board=rows,
+                         comments_per_goal=1)
+                    now = timezone.now()
+                    Board.objects.bulk_create([
+                        Board(title=f"bench extra {i}", created=now, updated=now) for i in range(rows)
+                    ])
+                    lists = [
+                        ("goals", Goal.objects.select_related("user")[:rows], GoalSerializer),
+                        ("comments", GoalComment.objects.select_related("user")[:rows], CommentSerializer),
+                        ("categories", GoalCategory.objects.select_related("user")[:rows], GoalCategorySerializer),
+                        ("boards", Board.objects.all()[:rows], BoardListSerializer),
+                    ]
+                    for name, queryset, serializer_class in lists:
+                        regular = measure(lambda: self.regular(queryset, serializer_class), options["repeat"])
+                        lean = measure(lambda: self.lean(queryset, serializer_class), options["repeat"])
+                        self.stdout.write(
+                            f"{name:>10} {rows:>7} {rows / regular * 1000:>16.0f} {rows / lean * 1000:>13.0f} "
+                            f"{regular / lean:>7.1f}x"
+                        )
+                    raise Rollback
+            except Rollback:
+                pass
+
+    @staticmethod
+    def regular(queryset, serializer_class):
+        return JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+
+    @staticmethod
+    def lean(queryset, serializer_class):
+        lean = get_lean_serializer(serializer_class)
+        return LeanJSONRenderer().render(lean.to_representation(lean.values(queryset.all())))
@@ -0,0 +1,50 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from goals.management.commands._seed import Rollback, seed, measure
+from goals.views import GoalListView
+
+SHAPES = [
+    ("nested", {}),
+    ("sideload", {"sideload": "users"}),
+    ("lean nested", {"lean": 1}),
+    ("lean sideload", {"lean": 1, "sideload": "users"}),
+]
+
+
+class Command(BaseCommand):
+    """
+    Размер ответа и время goal/list с вложенными пользователями и с подгрузкой users.
+    Время включает запросы, сериализацию и рендеринг JSON.
+    Данные создаются в транзакции и откатываются после замеров
+    """
+    help = "benchmark nested users against side-loaded users"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--participants", type=int, default=20)
+        parser.add_argument("--goals", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                owner = seed(boards=1, participants=options["participants"], goals_per_board=options["goals"])
+                self.stdout.write(f"{'shape':>14} {'bytes':>9} {'ms':>8}")
+                for name, params in SHAPES:
+                    params = {"limit": options["goals"], **params}
+                    size = len(self.get(owner, params).content)
+                    ms = measure(lambda: self.get(owner, params), options["repeat"])
+                    self.stdout.write(f"{name:>14} {size:>9} {ms:>8.2f}")
+                raise Rollback
+        except Rollback:
+            pass
+
+    @staticmethod
+    def get(owner, params):
+        request = APIRequestFactory().get("/goals/goal/list", params)
+        force_authenticate(request, user=owner)
+        response = GoalListView.as_view()(request)
+        response.render()
+        assert response.status_code == 200, response.data
+        return response
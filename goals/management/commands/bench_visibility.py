@@ -0,0 +1,42 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from goals.management.commands._seed import Rollback, seed, measure, int_list
+from goals.models import Goal
+
+
+class Command(BaseCommand):
+    """
+    Сравнение фильтра видимости через JOIN по участникам и через EXISTS.
+    Данные создаются в транзакции и откатываются после замеров
+    """
+    help = "benchmark goal visibility filter"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--boards", type=int_list, default=[1, 10, 50])
+        parser.add_argument("--participants", type=int_list, default=[1, 10, 100])
+        parser.add_argument("--goals", type=int, default=200, help="целей на доске")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'boards':>8} {'participants':>13} {'join, ms':>10} {'exists, ms':>11}")
+        for boards in options["boards"]:
+            for participants in options["participants"]:
+                try:
+                    with transaction.atomic():
+                        user = seed(boards=boards, participants=participants, goals_per_board=options["goals"])
+                        join = measure(lambda: self.page(
+                            Goal.objects.filter(category__board__participants__user=user)
+                        ), options["repeat"])
+                        exists = measure(lambda: self.page(
+                            Goal.objects.visible_to(user)
+                        ), options["repeat"])
+                        raise Rollback
+                except Rollback:
+                    pass
+                self.stdout.write(f"{boards:>8} {participants:>13} {join:>10.2f} {exists:>11.2f}")
+
+    @staticmethod
+    def page(queryset):
+        queryset.count()
+        list(queryset.order_by("priority", "due_date", "id")[:50])
@@ -0,0 +1,92 @@
+import re
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory
+
+from goals import views
+from goals.management.commands._seed import Rollback, seed
+from goals.models import Goal
+from goals.pagination import ordering_expressions
+
+LIST_VIEWS = [
+    ("goal/list", views.GoalListView, lambda user: {}),
+    ("goal/list?status=1", views.GoalListView, lambda user: {"status": 1}),
+    ("goal/list?pagination=cursor", views.GoalListView, lambda user: {"pagination": "cursor"}),
+    ("goal_category/list", views.GoalCategoryListView, lambda user: {}),
+    ("goal_comment/list?goal=", views.CommentListView, lambda user: {
+        "goal": Goal.objects.visible_to(user).values_list("id", flat=True).first(),
+    }),
+    ("board/list", views.BoardListView, lambda user: {}),
+]
+
+SEQ_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on (goals_\w+)"),
+    "sqlite": re.compile(r"SCAN (goals_\w+)$", re.MULTILINE),
+}
+
+
+class Command(BaseCommand):
+    """
+    Печатает план запроса каждого списка из goals/views.py на тестовых данных.
+    Данные создаются в транзакции и откатываются после вывода
+    """
+    help = "print EXPLAIN for goals list views"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--boards", type=int, default=20)
+        parser.add_argument("--participants", type=int, default=5)
+        parser.add_argument("--goals", type=int, default=500, help="целей на доске")
+        parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (только PostgreSQL)")
+        parser.add_argument("--fail-on-seq-scan", action="store_true")
+
+    def handle(self, *args, **options):
+        seq_scans = []
+        try:
+            with transaction.atomic():
+                user = seed(
+                    boards=options["boards"],
+                    participants=options["participants"],
+                    goals_per_board=options["goals"],
+                    comments_per_goal=1,
+                    prefix="explain",
+                )
+                if connection.vendor == "postgresql":
+                    with connection.cursor() as cursor:
+                        cursor.execute("ANALYZE")
+
+                for title, view_class, params in LIST_VIEWS:
+                    queryset = self.get_queryset(view_class, user, params(user))
+                    explain_options = {}
+                    if options["analyze"] and connection.vendor == "postgresql":
+                        explain_options["analyze"] = True
+                    plan = queryset[:50].explain(**explain_options)
+                    self.stdout.write(self.style.MIGRATE_HEADING(title))
+                    self.stdout.write(plan)
+                    self.stdout.write("")
+
+                    pattern = SEQ_SCAN.get(connection.vendor)
+                    tables = pattern.findall(plan) if pattern else []
+                    seq_scans += [f"{title}: {table}" for table in tables]
+                raise Rollback
+        except Rollback:
+            pass
+
+        for item in seq_scans:
+            self.stdout.write(self.style.WARNING(f"Последовательное чтение: {item}"))
+        if seq_scans and options["fail_on_seq_scan"]:
+            raise CommandError("В планах есть последовательное чтение таблиц")
+
+    @staticmethod
+    def get_queryset(view_class, user, params):
+        request = APIRequestFactory().get("/", params)
+        view = view_class()
+        view.setup(request)
+        view.format_kwarg = None
+        view.request = view.initialize_request(request)
+        view.request.user = user
+        queryset = view.filter_queryset(view.get_queryset())
+
+        if params.get("pagination") == "cursor":
+            queryset = queryset.order_by(*ordering_expressions(view.paginator.ordering))
+        return queryset
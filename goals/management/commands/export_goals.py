@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management import BaseCommand
+
+from goals.export import EXPORT_FORMATS, goal_rows
+from goals.models import Goal
+
+
+class Command(BaseCommand):
+    """
+    Выгрузка целей с комментариями в NDJSON или CSV без загрузки всех строк в память
+    """
+    help = "export goals"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board", type=int, help="только цели доски")
+        parser.add_argument("--user", type=int, help="только цели, видимые пользователю")
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--output", help="файл, по умолчанию stdout")
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        goals = Goal.objects.filter(category__is_deleted=False)
+        if options["user"]:
+            goals = Goal.objects.visible_to(options["user"]).filter(category__is_deleted=False)
+        if options["board"]:
+            goals = goals.filter(board_id=options["board"])
+
+        lines, _ = EXPORT_FORMATS[options["format"]]
+        output = open(options["output"], "w", encoding="utf-8", newline="") if options["output"] else sys.stdout
+        try:
+            for line in lines(goal_rows(goals, chunk_size=options["chunk_size"])):
+                output.write(line)
+        finally:
+            if output is not sys.stdout:
+                output.close()
@@ -0,0 +1,50 @@
+from django.core.management import BaseCommand, CommandError
+
+from core.models import User
+from goals.importer import GoalImporter
+from goals.models import GoalImportJob
+
+
+class Command(BaseCommand):
+    """
+    Импорт целей с комментариями из NDJSON или CSV в формате export_goals.
+    После сбоя запускается с --resume и тем же файлом
+    """
+    help = "import goals"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="файл импорта")
+        parser.add_argument("--user", type=int, help="автор целей, должен быть редактором досок")
+        parser.add_argument("--board", type=int, help="загрузить все строки в эту доску")
+        parser.add_argument("--format", choices=GoalImportJob.Format.values, default=None)
+        parser.add_argument("--resume", type=int, help="продолжить задание импорта")
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options["resume"]:
+            job = GoalImportJob.objects.filter(pk=options["resume"], is_done=False).select_related("user").first()
+            if job is None:
+                raise CommandError("Незавершенный импорт не найден")
+        else:
+            user = User.objects.filter(pk=options["user"]).first()
+            if user is None:
+                raise CommandError("Укажите пользователя --user")
+            file_format = options["format"] or (
+                GoalImportJob.Format.csv if options["path"].lower().endswith(".csv") else GoalImportJob.Format.ndjson
+            )
+            job = GoalImportJob(user=user, board_id=options["board"], format=file_format, source=options["path"][:255])
+            job.save()
+            self.stdout.write(f"Задание импорта: {job.id}")
+
+        def on_error(number, errors):
+            self.stderr.write(f"Строка {number}: {errors}")
+
+        with open(options["path"], encoding="utf-8", newline="") as stream:
+            report = GoalImporter(job, batch_size=options["batch_size"], on_error=on_error).run(stream)
+
+        self.stdout.write(
+            f"Строк: {report['rows']}, целей: {report['goals']}, комментариев: {report['comments']}, "
+            f"ошибок: {report['error_count']}, {report['rows_per_second']} строк/с"
+        )
+        if not report["is_done"]:
+            raise CommandError(f"Импорт прерван, продолжить: --resume {job.id}")
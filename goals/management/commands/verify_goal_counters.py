@@ -0,0 +1,34 @@
+from django.core.management import BaseCommand
+
+from goals.counters import find_drift, repair_board
+from goals.models import Board
+
+
+class Command(BaseCommand):
+    """
+    Сверка GoalCounter с целями по каждой доске и, с --repair, исправление расхождений
+    """
+    help = "verify and repair goal counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board", type=int, help="только одна доска")
+        parser.add_argument("--repair", action="store_true", help="исправить расхождения")
+
+    def handle(self, *args, **options):
+        board_ids = [options["board"]] if options["board"] else Board.objects.order_by("id").values_list(
+            "id", flat=True
+        )
+        boards = keys = 0
+        for board_id in board_ids:
+            drift = repair_board(board_id) if options["repair"] else find_drift(board_id)
+            if not drift:
+                continue
+            boards += 1
+            keys += len(drift)
+            for (_, category_id, status, priority, due_date), (stored, actual) in sorted(drift.items(), key=str):
+                self.stdout.write(
+                    f"доска {board_id}, категория {category_id}, статус {status}, приоритет {priority}, "
+                    f"срок {due_date}: {stored} вместо {actual}"
+                )
+        action = "исправлено" if options["repair"] else "найдено"
+        self.stdout.write(f"Расхождений {action}: {keys} на {boards} досках")
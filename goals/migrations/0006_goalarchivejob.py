@@ -0,0 +1,34 @@
+# Generated by Django 4.0.1 on 2026-10-18 08:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0005_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalArchiveJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(verbose_name='Дата последнего обновления')),
+                ('last_goal_id', models.BigIntegerField(default=0, verbose_name='Последняя обработанная цель')),
+                ('is_done', models.BooleanField(default=False, verbose_name='Завершено')),
+                ('board', models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.PROTECT, to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.PROTECT, to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Архивирование целей',
+                'verbose_name_plural': 'Архивирование целей',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='goalarchivejob',
+            index=models.Index(condition=models.Q(('is_done', False)), fields=['id'], name='archive_job_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.0.1 on 2026-10-18 08:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0006_goalarchivejob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='board',
+            name='updated',
+            field=models.DateTimeField(db_index=True, verbose_name='Дата последнего обновления'),
+        ),
+        migrations.AlterField(
+            model_name='boardparticipant',
+            name='updated',
+            field=models.DateTimeField(db_index=True, verbose_name='Дата последнего обновления'),
+        ),
+        migrations.AlterField(
+            model_name='goal',
+            name='updated',
+            field=models.DateTimeField(db_index=True, verbose_name='Дата последнего обновления'),
+        ),
+        migrations.AlterField(
+            model_name='goalarchivejob',
+            name='updated',
+            field=models.DateTimeField(db_index=True, verbose_name='Дата последнего обновления'),
+        ),
+        migrations.AlterField(
+            model_name='goalcategory',
+            name='updated',
+            field=models.DateTimeField(db_index=True, verbose_name='Дата последнего обновления'),
+        ),
+        migrations.AlterField(
+            model_name='goalcomment',
+            name='updated',
+            field=models.DateTimeField(db_index=True, verbose_name='Дата последнего обновления'),
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(db_index=True, verbose_name='Дата последнего обновления')),
+                ('kind', models.CharField(choices=[('board', 'Доска'), ('participant', 'Участник'), ('comment', 'Комментарий')], max_length=16, verbose_name='Тип объекта')),
+                ('object_id', models.BigIntegerField(verbose_name='ID объекта')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='goals.board', verbose_name='Доска')),
+                ('user', models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Удаленный объект',
+                'verbose_name_plural': 'Удаленные объекты',
+            },
+        ),
+    ]
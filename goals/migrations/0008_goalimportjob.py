@@ -0,0 +1,37 @@
+# Generated by Django 4.0.1 on 2026-10-18 08:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0007_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(db_index=True, verbose_name='Дата последнего обновления')),
+                ('format', models.CharField(choices=[('ndjson', 'NDJSON'), ('csv', 'CSV')], max_length=16, verbose_name='Формат')),
+                ('source', models.CharField(blank=True, default='', max_length=255, verbose_name='Источник')),
+                ('rows_done', models.PositiveIntegerField(default=0, verbose_name='Обработано строк')),
+                ('goals_created', models.PositiveIntegerField(default=0, verbose_name='Создано целей')),
+                ('comments_created', models.PositiveIntegerField(default=0, verbose_name='Создано комментариев')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Строк с ошибками')),
+                ('is_done', models.BooleanField(default=False, verbose_name='Завершено')),
+                ('board', models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='goals.board', verbose_name='Доска')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Импорт целей',
+                'verbose_name_plural': 'Импорт целей',
+            },
+        ),
+    ]
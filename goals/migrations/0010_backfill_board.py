@@ -0,0 +1,38 @@
+from django.db import migrations, transaction
+from django.db.models import Max, OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def fill(model, board, using):
+    """
+    Заполняет board_id диапазонами id, каждый диапазон в своей транзакции
+    """
+    last = model.objects.using(using).aggregate(last=Max("id"))["last"] or 0
+    for start in range(0, last, BATCH_SIZE):
+        with transaction.atomic(using=using):
+            model.objects.using(using).filter(
+                id__gt=start, id__lte=start + BATCH_SIZE, board__isnull=True
+            ).update(board_id=Subquery(board))
+
+
+def backfill(apps, schema_editor):
+    GoalCategory = apps.get_model("goals", "GoalCategory")
+    Goal = apps.get_model("goals", "Goal")
+    GoalComment = apps.get_model("goals", "GoalComment")
+    using = schema_editor.connection.alias
+
+    fill(Goal, GoalCategory.objects.filter(pk=OuterRef("category_id")).values("board_id")[:1], using)
+    fill(GoalComment, Goal.objects.filter(pk=OuterRef("goal_id")).values("board_id")[:1], using)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0009_goal_board'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.0.1 on 2026-10-18 08:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+FIELDS = ("board_id", "category_id", "status", "priority", "due_date")
+
+
+def fill_counters(apps, schema_editor):
+    Goal = apps.get_model("goals", "Goal")
+    GoalCounter = apps.get_model("goals", "GoalCounter")
+    using = schema_editor.connection.alias
+    rows = Goal.objects.using(using).order_by().values(*FIELDS).annotate(count=models.Count("id"))
+    GoalCounter.objects.using(using).bulk_create(
+        (GoalCounter(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0011_goal_board_not_null'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.PositiveIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('due_date', models.DateField(blank=True, default=None, null=True, verbose_name='Дата выполнения')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество')),
+                ('board', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Счетчик целей',
+                'verbose_name_plural': 'Счетчики целей',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='goalcounter',
+            index=models.Index(fields=['board', 'status'], name='goal_counter_board_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='goalcounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('due_date__isnull', False)), fields=('category', 'status', 'priority', 'due_date'), name='goal_counter_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='goalcounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('due_date__isnull', True)), fields=('category', 'status', 'priority'), name='goal_counter_key_no_date'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
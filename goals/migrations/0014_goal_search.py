@@ -0,0 +1,163 @@
+from django.db import migrations, transaction
+from django.db.models import Max
+
+BATCH_SIZE = 10000
+
+# Postgres: колонка tsvector у цели из заголовка, описания и текста комментариев с весами A, B, C.
+# Колонка поддерживается триггерами, поэтому ее не обходят bulk_create и queryset.update()
+POSTGRES_INSTALL = [
+    "ALTER TABLE goals_goal ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION goals_goal_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B') ||
+            setweight(to_tsvector('russian', coalesce(
+                (SELECT string_agg(text, ' ') FROM goals_goalcomment WHERE goal_id = NEW.id), ''
+            )), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER goals_goal_search_vector BEFORE INSERT OR UPDATE OF title, description ON goals_goal
+    FOR EACH ROW EXECUTE PROCEDURE goals_goal_search_vector()
+    """,
+    """
+    CREATE FUNCTION goals_goalcomment_search_vector() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'DELETE' THEN
+            UPDATE goals_goal SET title = title WHERE id = NEW.goal_id;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            UPDATE goals_goal SET title = title WHERE id = OLD.goal_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER goals_goalcomment_search_vector AFTER INSERT OR UPDATE OF text, goal_id OR DELETE
+    ON goals_goalcomment FOR EACH ROW EXECUTE PROCEDURE goals_goalcomment_search_vector()
+    """,
+]
+POSTGRES_BACKFILL = "UPDATE goals_goal SET title = title WHERE id > %s AND id <= %s"
+POSTGRES_INDEX = "CREATE INDEX CONCURRENTLY goal_search_idx ON goals_goal USING gin (search_vector)"
+POSTGRES_UNINSTALL = [
+    "DROP INDEX CONCURRENTLY IF EXISTS goal_search_idx",
+    "DROP TRIGGER IF EXISTS goals_goalcomment_search_vector ON goals_goalcomment",
+    "DROP FUNCTION IF EXISTS goals_goalcomment_search_vector()",
+    "DROP TRIGGER IF EXISTS goals_goal_search_vector ON goals_goal",
+    "DROP FUNCTION IF EXISTS goals_goal_search_vector()",
+    "ALTER TABLE goals_goal DROP COLUMN IF EXISTS search_vector",
+]
+
+# SQLite: таблица FTS5 с rowid = id цели, тоже на триггерах.
+# SQLite пересоздает таблицу при изменении ее колонок и теряет ее триггеры
+SQLITE_COMMENTS = "coalesce((SELECT group_concat(text, ' ') FROM goals_goalcomment WHERE goal_id = {goal_id}), '')"
+SQLITE_TABLE = """
+    CREATE VIRTUAL TABLE goals_goal_fts USING fts5(
+        title, description, comments, tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+# пропавшие триггеры ставит заново goals.search.reinstall_sqlite_triggers после каждой миграции
+SQLITE_TRIGGERS = {
+    "goals_goal_fts_insert": """
+    CREATE TRIGGER goals_goal_fts_insert AFTER INSERT ON goals_goal BEGIN
+        INSERT INTO goals_goal_fts (rowid, title, description, comments)
+        VALUES (new.id, new.title, coalesce(new.description, ''), '');
+    END
+    """,
+    "goals_goal_fts_update": """
+    CREATE TRIGGER goals_goal_fts_update AFTER UPDATE OF title, description ON goals_goal BEGIN
+        UPDATE goals_goal_fts SET title = new.title, description = coalesce(new.description, '')
+        WHERE rowid = new.id;
+    END
+    """,
+    "goals_goal_fts_delete": """
+    CREATE TRIGGER goals_goal_fts_delete AFTER DELETE ON goals_goal BEGIN
+        DELETE FROM goals_goal_fts WHERE rowid = old.id;
+    END
+    """,
+    "goals_goalcomment_fts_insert": f"""
+    CREATE TRIGGER goals_goalcomment_fts_insert AFTER INSERT ON goals_goalcomment BEGIN
+        UPDATE goals_goal_fts SET comments = {SQLITE_COMMENTS.format(goal_id="new.goal_id")}
+        WHERE rowid = new.goal_id;
+    END
+    """,
+    "goals_goalcomment_fts_update": f"""
+    CREATE TRIGGER goals_goalcomment_fts_update AFTER UPDATE OF text, goal_id ON goals_goalcomment BEGIN
+        UPDATE goals_goal_fts SET comments = {SQLITE_COMMENTS.format(goal_id="old.goal_id")}
+        WHERE rowid = old.goal_id;
+        UPDATE goals_goal_fts SET comments = {SQLITE_COMMENTS.format(goal_id="new.goal_id")}
+        WHERE rowid = new.goal_id;
+    END
+    """,
+    "goals_goalcomment_fts_delete": f"""
+    CREATE TRIGGER goals_goalcomment_fts_delete AFTER DELETE ON goals_goalcomment BEGIN
+        UPDATE goals_goal_fts SET comments = {SQLITE_COMMENTS.format(goal_id="old.goal_id")}
+        WHERE rowid = old.goal_id;
+    END
+    """,
+}
+SQLITE_INSTALL = [SQLITE_TABLE, *SQLITE_TRIGGERS.values()]
+SQLITE_BACKFILL = f"""
+    INSERT OR REPLACE INTO goals_goal_fts (rowid, title, description, comments)
+    SELECT id, title, coalesce(description, ''), {SQLITE_COMMENTS.format(goal_id="goals_goal.id")}
+    FROM goals_goal WHERE id > %s AND id <= %s
+"""
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS goals_goalcomment_fts_delete",
+    "DROP TRIGGER IF EXISTS goals_goalcomment_fts_update",
+    "DROP TRIGGER IF EXISTS goals_goalcomment_fts_insert",
+    "DROP TRIGGER IF EXISTS goals_goal_fts_delete",
+    "DROP TRIGGER IF EXISTS goals_goal_fts_update",
+    "DROP TRIGGER IF EXISTS goals_goal_fts_insert",
+    "DROP TABLE IF EXISTS goals_goal_fts",
+]
+
+
+def install(apps, schema_editor):
+    """
+    Триггеры ставятся до заполнения, поэтому цели, созданные во время заполнения, не теряются.
+    Заполнение идет диапазонами id, каждый в своей транзакции, GIN индекс строится без блокировки записи
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor not in ("postgresql", "sqlite"):
+        return
+    statements, backfill = (
+        (POSTGRES_INSTALL, POSTGRES_BACKFILL) if vendor == "postgresql" else (SQLITE_INSTALL, SQLITE_BACKFILL)
+    )
+    using = schema_editor.connection.alias
+    with transaction.atomic(using=using):
+        for sql in statements:
+            schema_editor.execute(sql, None)
+
+    Goal = apps.get_model("goals", "Goal")
+    last = Goal.objects.using(using).aggregate(last=Max("id"))["last"] or 0
+    for start in range(0, last, BATCH_SIZE):
+        with transaction.atomic(using=using):
+            schema_editor.execute(backfill, (start, start + BATCH_SIZE))
+
+    if vendor == "postgresql":
+        schema_editor.execute(POSTGRES_INDEX, None)
+
+
+def uninstall(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"postgresql": POSTGRES_UNINSTALL, "sqlite": SQLITE_UNINSTALL}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql, None)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0013_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# только Postgres, для SQLite автодополнение строит индекс триграмм в памяти (goals.autocomplete).
+# Расширение pg_trgm может потребовать прав суперпользователя, тогда его нужно создать заранее
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS category_title_trgm_idx ON goals_goalcategory "
+    "USING gin (title gin_trgm_ops) WHERE NOT is_deleted",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS goal_title_trgm_idx ON goals_goal USING gin (title gin_trgm_ops)",
+]
+POSTGRES_UNINSTALL = [
+    "DROP INDEX CONCURRENTLY IF EXISTS goal_title_trgm_idx",
+    "DROP INDEX CONCURRENTLY IF EXISTS category_title_trgm_idx",
+]
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in POSTGRES_INSTALL:
+            schema_editor.execute(sql, None)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in POSTGRES_UNINSTALL:
+            schema_editor.execute(sql, None)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0014_goal_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Exists, F, OuterRef, Q
 from django.utils import timezone
 
 from core.models import User
@@ -13,7 +14,7 @@ class DatesModel(models.Model):
         abstract = True
 
     created = models.DateTimeField(verbose_name="Дата создания")
-    updated = models.DateTimeField(verbose_name="Дата последнего обновления")
+    updated = models.DateTimeField(verbose_name="Дата последнего обновления", db_index=True)
 
     def save(self, *args, **kwargs):
         if not self.id:
@@ -22,16 +23,79 @@ class DatesModel(models.Model):
         return super().save(*args, **kwargs)
 
 
-class Board(DatesModel):
+class VersionedModel(DatesModel):
+    """
+    Абстрактный класс с номером версии, который растет при каждом сохранении.
+    Условную запись по версии выполняет VersionedUpdateMixin.perform_update (goals.conditional):
+    он проверяет версию и блокирует строку, а сохранение записывает следующую версию
+    """
+
+    class Meta:
+        abstract = True
+
+    version = models.PositiveIntegerField(verbose_name="Версия", default=1, editable=False)
+
+    # версия строки, проверенная под блокировкой до сохранения; без нее версия растет в самой базе
+    expected_version = None
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        if self.expected_version is not None:
+            self.version = self.expected_version + 1
+            result = super().save(*args, **kwargs)
+        else:
+            self.version = F("version") + 1
+            result = super().save(*args, **kwargs)
+            self.refresh_from_db(fields=["version"])
+        self.expected_version = None
+        return result
+
+
+class VisibleQuerySet(models.QuerySet):
+    """
+    Фильтр объектов по участию пользователя в доске.
+    Использует коррелированный EXISTS, поэтому строки не размножаются и distinct() не нужен
+    """
+    board_field = "board_id"
+
+    def visible_to(self, user, min_role=None):
+        """
+        Объекты досок, где user участник с ролью не ниже min_role
+        """
+        participants = BoardParticipant.objects.filter(
+            board_id=OuterRef(self.board_field), user=user
+        )
+        if min_role is not None:
+            participants = participants.filter(role__lte=min_role)
+        return self.filter(Exists(participants))
+
+    def on_board(self, board_id):
+        """
+        Объекты одной доски. Участие пользователя проверяется отдельно
+        """
+        return self.filter(**{self.board_field: board_id})
+
+
+class BoardQuerySet(VisibleQuerySet):
+    board_field = "pk"
+
+
+class Board(VersionedModel):
     """
     Модель доски
     """
     title = models.CharField(verbose_name="Название", max_length=255)
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
 
+    objects = BoardQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Доска"
         verbose_name_plural = "Доски"
+        indexes = [
+            models.Index(fields=["title"], condition=Q(is_deleted=False), name="board_live_title_idx"),
+        ]
 
 
 class BoardParticipant(DatesModel):
@@ -43,6 +107,10 @@ class BoardParticipant(DatesModel):
         unique_together = ("board", "user")
         verbose_name = "Участник"
         verbose_name_plural = "Участники"
+        indexes = [
+            models.Index(fields=["board", "user", "role"], name="participant_board_user_idx"),
+            models.Index(fields=["user", "board", "role"], name="participant_user_board_idx"),
+        ]
 
     class Role(models.IntegerChoices):
         owner = 1, "Владелец"
@@ -69,7 +137,7 @@ class BoardParticipant(DatesModel):
     )
 
 
-class GoalCategory(DatesModel):
+class GoalCategory(VersionedModel):
     """
     Модель категории для целей
     """
@@ -83,15 +151,20 @@ class GoalCategory(DatesModel):
     user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT)
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
 
+    objects = VisibleQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
+        indexes = [
+            models.Index(fields=["board", "title"], condition=Q(is_deleted=False), name="category_live_board_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
 
-class Goal(DatesModel):
+class Goal(VersionedModel):
     """
     Модель целей.
     Реализован выбор статуса и приоритета
@@ -114,6 +187,16 @@ class Goal(DatesModel):
         on_delete=models.PROTECT
     )
 
+    # копия category.board_id, чтобы видимость проверялась без соединения с категорией
+    board = models.ForeignKey(
+        Board,
+        verbose_name="Доска",
+        related_name="goals",
+        on_delete=models.PROTECT,
+        editable=False,
+        db_index=False,
+    )
+
     user = models.ForeignKey(
         User,
         verbose_name="Пользователь",
@@ -152,13 +235,58 @@ class Goal(DatesModel):
         default=Priority.medium,
     )
 
+    objects = VisibleQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Цель"
         verbose_name_plural = "Цели"
+        indexes = [
+            models.Index(fields=["category", "status"], name="goal_category_status_idx"),
+            models.Index(fields=["priority", "due_date", "id"], name="goal_ordering_idx"),
+            models.Index(fields=["board", "status"], name="goal_board_status_idx"),
+            models.Index(fields=["board", "priority", "due_date", "id"], name="goal_board_ordering_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    # ключ счетчика GoalCounter на момент загрузки из базы
+    _counter_key = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in field_names for name in COUNTER_FIELDS):
+            instance._counter_key = instance.counter_key()
+        return instance
+
+    def counter_key(self) -> tuple:
+        return tuple(getattr(self, name) for name in COUNTER_FIELDS)
+
+    def save(self, *args, **kwargs):
+        self.board_id = self.category.board_id
+        new = self.counter_key()
+        with transaction.atomic(savepoint=False):
+            old = None
+            if not self._state.adding:
+                # ключ загрузки верен, только если версия проверена, иначе строку перечитываем под блокировкой
+                old = self._counter_key if self.expected_version is not None else None
+                if old is None:
+                    row = Goal.objects.select_for_update().filter(pk=self.pk).values_list(
+                        *COUNTER_FIELDS, "version"
+                    ).first()
+                    if row is not None:
+                        # строка заблокирована, поэтому ее версию можно считать проверенной
+                        old, self.expected_version = row[:-1], row[-1]
+            result = super().save(*args, **kwargs)
+            if old != new:
+                deltas = {new: 1}
+                if old is not None:
+                    deltas[old] = -1
+                GoalCounter.apply(deltas)
+        self._counter_key = new
+        return result
+
 
 class GoalComment(DatesModel):
     """
@@ -178,8 +306,210 @@ class GoalComment(DatesModel):
         on_delete=models.PROTECT,
     )
 
+    # копия goal.board_id
+    board = models.ForeignKey(
+        Board,
+        verbose_name="Доска",
+        related_name='goal_comments',
+        on_delete=models.PROTECT,
+        editable=False,
+        db_index=False,
+    )
+
     text = models.TextField(verbose_name="Текст")
 
+    objects = VisibleQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(fields=["goal", "-id"], name="comment_goal_id_idx"),
+            models.Index(fields=["board", "-id"], name="comment_board_id_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.board_id = self.goal.board_id
+        return super().save(*args, **kwargs)
+
+
+COUNTER_FIELDS = ("board_id", "category_id", "status", "priority", "due_date")
+
+
+class GoalCounter(models.Model):
+    """
+    Число целей категории с одинаковыми статусом, приоритетом и сроком.
+    Итоги по доске и категории, включая просроченные на сегодня, суммируются по этим строкам.
+    Обновляется в одной транзакции с изменением целей
+    """
+    board = models.ForeignKey(
+        Board,
+        verbose_name="Доска",
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+    )
+    category = models.ForeignKey(
+        GoalCategory,
+        verbose_name="Категория",
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+    )
+    status = models.PositiveIntegerField(verbose_name="Статус", choices=Goal.Status.choices)
+    priority = models.PositiveIntegerField(verbose_name="Приоритет", choices=Goal.Priority.choices)
+    due_date = models.DateField(verbose_name="Дата выполнения", null=True, blank=True, default=None)
+    count = models.IntegerField(verbose_name="Количество", default=0)
+
+    class Meta:
+        verbose_name = "Счетчик целей"
+        verbose_name_plural = "Счетчики целей"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "status", "priority", "due_date"],
+                condition=Q(due_date__isnull=False),
+                name="goal_counter_key",
+            ),
+            models.UniqueConstraint(
+                fields=["category", "status", "priority"],
+                condition=Q(due_date__isnull=True),
+                name="goal_counter_key_no_date",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["board", "status"], name="goal_counter_board_idx"),
+        ]
+
+    @classmethod
+    def apply(cls, deltas):
+        """
+        Прибавляет изменения {(board_id, category_id, status, priority, due_date): delta}.
+        Ключи обходятся в одном порядке, чтобы параллельные транзакции не блокировали друг друга
+        """
+        for key in sorted(deltas, key=lambda key: (key[1], key[2], key[3], str(key[4]))):
+            if not deltas[key]:
+                continue
+            board_id, category_id, status, priority, due_date = key
+            lookup = dict(category_id=category_id, status=status, priority=priority, due_date=due_date)
+            if cls.objects.filter(**lookup).update(count=F("count") + deltas[key]):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(board_id=board_id, count=deltas[key], **lookup)
+            except IntegrityError:
+                cls.objects.filter(**lookup).update(count=F("count") + deltas[key])
+
+
+class GoalArchiveJob(DatesModel):
+    """
+    Фоновое архивирование целей удаленной доски или категории.
+    Цели архивируются пачками по возрастанию id, last_goal_id хранит прогресс
+    """
+    board = models.ForeignKey(
+        Board,
+        verbose_name="Доска",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        default=None,
+    )
+    category = models.ForeignKey(
+        GoalCategory,
+        verbose_name="Категория",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        default=None,
+    )
+    last_goal_id = models.BigIntegerField(verbose_name="Последняя обработанная цель", default=0)
+    is_done = models.BooleanField(verbose_name="Завершено", default=False)
+
+    class Meta:
+        verbose_name = "Архивирование целей"
+        verbose_name_plural = "Архивирование целей"
+        indexes = [
+            models.Index(fields=["id"], condition=Q(is_done=False), name="archive_job_pending_idx"),
+        ]
+
+    def goals(self):
+        if self.board_id:
+            return Goal.objects.filter(board_id=self.board_id)
+        return Goal.objects.filter(category_id=self.category_id)
+
+
+class Tombstone(DatesModel):
+    """
+    Запись об удалении объекта для синхронизации клиентов.
+    Если задан user, удаление касается только его (например, его убрали из доски)
+    """
+    class Kind(models.TextChoices):
+        board = "board", "Доска"
+        participant = "participant", "Участник"
+        comment = "comment", "Комментарий"
+
+    kind = models.CharField(verbose_name="Тип объекта", max_length=16, choices=Kind.choices)
+    object_id = models.BigIntegerField(verbose_name="ID объекта")
+    board = models.ForeignKey(
+        Board,
+        verbose_name="Доска",
+        on_delete=models.PROTECT,
+        related_name="+",
+    )
+    user = models.ForeignKey(
+        User,
+        verbose_name="Пользователь",
+        on_delete=models.PROTECT,
+        related_name="+",
+        null=True,
+        blank=True,
+        default=None,
+    )
+
+    class Meta:
+        verbose_name = "Удаленный объект"
+        verbose_name_plural = "Удаленные объекты"
+
+    @classmethod
+    def record(cls, kind, board_id, object_ids, user_id=None):
+        now = timezone.now()
+        cls.objects.bulk_create([
+            cls(kind=kind, object_id=object_id, board_id=board_id, user_id=user_id, created=now, updated=now)
+            for object_id in object_ids
+        ])
+
+
+class GoalImportJob(DatesModel):
+    """
+    Импорт целей из файла от имени пользователя.
+    Строки загружаются пачками, rows_done хранит прогресс для продолжения после сбоя
+    """
+    class Format(models.TextChoices):
+        ndjson = "ndjson", "NDJSON"
+        csv = "csv", "CSV"
+
+    user = models.ForeignKey(
+        User,
+        verbose_name="Пользователь",
+        on_delete=models.PROTECT,
+        related_name="+",
+    )
+    board = models.ForeignKey(
+        Board,
+        verbose_name="Доска",
+        on_delete=models.PROTECT,
+        related_name="+",
+        null=True,
+        blank=True,
+        default=None,
+    )
+    format = models.CharField(verbose_name="Формат", max_length=16, choices=Format.choices)
+    source = models.CharField(verbose_name="Источник", max_length=255, blank=True, default="")
+    rows_done = models.PositiveIntegerField(verbose_name="Обработано строк", default=0)
+    goals_created = models.PositiveIntegerField(verbose_name="Создано целей", default=0)
+    comments_created = models.PositiveIntegerField(verbose_name="Создано комментариев", default=0)
+    error_count = models.PositiveIntegerField(verbose_name="Строк с ошибками", default=0)
+    is_done = models.BooleanField(verbose_name="Завершено", default=False)
+
+    class Meta:
+        verbose_name = "Импорт целей"
+        verbose_name_plural = "Импорт целей"
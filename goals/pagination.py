@@ -0,0 +1,200 @@
+from collections import OrderedDict
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def positive_int(value, cutoff=None) -> int:
+    """
+    Положительное целое из параметра запроса, не больше cutoff. Иначе ValueError
+    """
+    number = int(value)
+    if number <= 0:
+        raise ValueError(f"Ожидалось положительное число: {value}")
+    return min(number, cutoff) if cutoff else number
+
+
+def get_limit(request, cutoff, default=None, param="limit"):
+    """
+    Параметр limit запроса; без него или с неверным значением default
+    """
+    try:
+        return positive_int(request.query_params[param], cutoff)
+    except (KeyError, ValueError):
+        return default
+
+
+def ordering_expressions(ordering, reverse=False):
+    """
+    Выражения сортировки для order_by. NULL всегда идут в конце прямого порядка
+    """
+    expressions = []
+    for name in ordering:
+        expression = F(name.lstrip("-"))
+        if name.startswith("-") != reverse:
+            expressions.append(expression.desc(nulls_first=reverse, nulls_last=not reverse))
+        else:
+            expressions.append(expression.asc(nulls_first=reverse, nulls_last=not reverse))
+    return expressions
+
+
+def keyset_q(ordering, values, reverse=False):
+    """
+    Условие "строка идет после values" в порядке ordering (или до values при reverse)
+    """
+    condition = Q(pk__in=[])
+    prefix = Q()
+    for name, value in zip(ordering, values):
+        field = name.lstrip("-")
+        if value is None:
+            step = Q(**{f"{field}__isnull": False}) if reverse else Q(pk__in=[])
+            same = Q(**{f"{field}__isnull": True})
+        else:
+            lookup = "lt" if name.startswith("-") != reverse else "gt"
+            step = Q(**{f"{field}__{lookup}": value})
+            if not reverse:
+                step |= Q(**{f"{field}__isnull": True})
+            same = Q(**{field: value})
+        condition |= prefix & step
+        prefix &= same
+    return condition
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Пагинация по ключу сортировки (keyset). Включается параметром cursor
+    или pagination=cursor, без них работает обычный limit/offset.
+    Курсор подписан SECRET_KEY, поэтому его нельзя подделать
+    """
+    ordering = ("-id",)
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    cursor_page_size = 50
+    max_limit = 500
+    invalid_cursor_message = "Неверный курсор"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == "cursor"
+        )
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.limit = self.get_cursor_limit(request)
+        self.ordering = self.get_cursor_ordering(request, queryset, view)
+        position, self.reverse = self.decode_cursor(request)
+
+        if position is not None:
+            queryset = queryset.filter(keyset_q(self.ordering, position, self.reverse))
+        queryset = queryset.order_by(*ordering_expressions(self.ordering, self.reverse))
+
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if self.reverse:
+            results.reverse()
+
+        self.has_next = has_more if not self.reverse else position is not None
+        self.has_previous = has_more if self.reverse else position is not None
+        self.first_position = self.get_position(results[0]) if results else position
+        self.last_position = self.get_position(results[-1]) if results else position
+        return results
+
+    def get_cursor_ordering(self, request, queryset, view):
+        """
+        Порядок из ?ordering= (OrderingFilter представления) с id для однозначности ключа,
+        без параметра свой ordering. Курсор подписан вместе с порядком и в другом порядке не принимается
+        """
+        backend = next(
+            (backend for backend in getattr(view, "filter_backends", ()) if issubclass(backend, OrderingFilter)),
+            None,
+        )
+        if backend is None or backend.ordering_param not in request.query_params:
+            return type(self).ordering
+        ordering = list(backend().get_ordering(request, queryset, view) or type(self).ordering)
+        if not {"id", "-id"} & set(ordering):
+            ordering.append("id")
+        return tuple(ordering)
+
+    def get_cursor_limit(self, request):
+        return get_limit(request, self.max_limit, self.cursor_page_size, self.limit_query_param)
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return [row[name.lstrip("-")] for name in self.ordering]
+        return [getattr(row, name.lstrip("-")) for name in self.ordering]
+
+    def get_salt(self):
+        return "goals.pagination:" + ",".join(self.ordering)
+
+    def encode_cursor(self, position, reverse):
+        payload = {
+            "p": [None if value is None else str(value) for value in position],
+            "r": int(reverse),
+        }
+        token = signing.dumps(payload, salt=self.get_salt(), compress=True)
+        url = remove_query_param(self.base_url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = signing.loads(token, salt=self.get_salt())
+            position = [
+                None if value is None else self.model._meta.get_field(name.lstrip("-")).to_python(value)
+                for name, value in zip(self.ordering, payload["p"], strict=True)
+            ]
+            return position, bool(payload["r"])
+        except (signing.BadSignature, ValidationError, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_html_context(self):
+        if not self.use_cursor:
+            return super().get_html_context()
+        return {
+            "previous_url": self.get_previous_link(),
+            "next_url": self.get_next_link(),
+        }
+
+
+class GoalPagination(KeysetPagination):
+    ordering = ("priority", "due_date", "id")
+
+
+class CommentPagination(KeysetPagination):
+    ordering = ("-id",)
@@ -1,6 +1,6 @@
 from rest_framework import permissions
 
-from goals.models import BoardParticipant
+from goals.roles import get_board_roles
 
 
 class CommentPermissions(permissions.BasePermission):
@@ -12,7 +12,7 @@ class CommentPermissions(permissions.BasePermission):
             return False
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.user == request.user
+        return obj.user_id == request.user.id
 
 
 class GoalCategoryPermissions(permissions.BasePermission):
@@ -23,14 +23,8 @@ class GoalCategoryPermissions(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(
-                user=request.user, board=obj.board
-            ).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user,
-            board=obj.board,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-        ).exists()
+            return get_board_roles(request).can_read(obj.board_id)
+        return get_board_roles(request).can_write(obj.board_id)
 
 
 class GoalPermissions(permissions.BasePermission):
@@ -41,14 +35,8 @@ class GoalPermissions(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(
-                user=request.user, board=obj.category.board
-            ).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user,
-            board=obj.category.board,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-        ).exists()
+            return get_board_roles(request).can_read(obj.board_id)
+        return get_board_roles(request).can_write(obj.board_id)
 
 
 class BoardPermissions(permissions.BasePermission):
@@ -59,9 +47,5 @@ class BoardPermissions(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(
-                user=request.user, board=obj
-            ).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj, role=BoardParticipant.Role.owner
-        ).exists()
+            return get_board_roles(request).can_read(obj.id)
+        return get_board_roles(request).is_owner(obj.id)
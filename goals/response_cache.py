@@ -0,0 +1,81 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from goals.cache import get_versions
+from goals.roles import get_board_roles
+
+CACHED_VIEWS = []
+
+
+def _stats_key(view_name, result):
+    return f"goals:response:stats:{view_name}:{result}"
+
+
+def record(view_name, result):
+    key = _stats_key(view_name, result)
+    if not cache.add(key, 1, timeout=None):
+        cache.incr(key)
+
+
+def get_stats() -> dict:
+    """
+    Попадания и промахи кэша ответов по представлениям
+    """
+    keys = {_stats_key(name, result): (name, result) for name in CACHED_VIEWS for result in ("hits", "misses")}
+    found = cache.get_many(keys)
+    stats = {name: {"hits": 0, "misses": 0} for name in CACHED_VIEWS}
+    for key, (name, result) in keys.items():
+        stats[name][result] = found.get(key, 0)
+    return stats
+
+
+class CachedListMixin:
+    """
+    Кэш ответов списков. Ключ строится из пользователя, нормализованных параметров запроса
+    и версий данных его досок (или одной доски для board/<board_pk>/...).
+    Запись в доску повышает только ее версию (goals.signals и массовые операции),
+    данные самих пользователей в ответах обновятся по истечении GOALS_RESPONSE_CACHE_TIMEOUT
+    """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        CACHED_VIEWS.append(cls.__name__)
+
+    def get_cache_board_ids(self) -> list:
+        roles = get_board_roles(self.request)
+        board_id = self.kwargs.get("board_pk")
+        if board_id is None:
+            return sorted(roles.board_ids)
+        if not roles.can_read(board_id):
+            raise NotFound
+        return [board_id]
+
+    def get_response_cache_key(self) -> str:
+        versions = get_versions("board_data", self.get_cache_board_ids())
+        params = sorted((key, sorted(values)) for key, values in self.request.query_params.lists())
+        payload = json.dumps([self.request.get_host(), self.request.path, params, sorted(versions.items())])
+        digest = hashlib.md5(payload.encode()).hexdigest()
+        return f"goals:response:{type(self).__name__}:{self.request.user.id}:{digest}"
+
+    def list(self, request, *args, **kwargs):
+        timeout = settings.GOALS_RESPONSE_CACHE_TIMEOUT
+        if not timeout:
+            return super().list(request, *args, **kwargs)
+
+        view_name = type(self).__name__
+        key = self.get_response_cache_key()
+        data = cache.get(key)
+        if data is not None:
+            record(view_name, "hits")
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = super().list(request, *args, **kwargs)
+        record(view_name, "misses")
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=timeout)
+        response["X-Cache"] = "MISS"
+        return response
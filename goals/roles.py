@@ -0,0 +1,51 @@
+from goals.cache import load_memberships
+from goals.models import BoardParticipant
+
+WRITE_ROLES = (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+
+
+class BoardRoles:
+    """
+    Роли пользователя во всех его досках вида {board_id: role}.
+    Загружаются из кэша или одним запросом при первом обращении
+    """
+    def __init__(self, user):
+        self.user = user
+        self._roles = None
+
+    @property
+    def roles(self) -> dict:
+        if self._roles is None:
+            self._roles = load_memberships(self.user.id)
+        return self._roles
+
+    @property
+    def board_ids(self) -> list:
+        return list(self.roles)
+
+    def role(self, board_id):
+        return self.roles.get(board_id)
+
+    def can_read(self, board_id) -> bool:
+        return board_id in self.roles
+
+    def can_write(self, board_id) -> bool:
+        return self.role(board_id) in WRITE_ROLES
+
+    def is_owner(self, board_id) -> bool:
+        return self.role(board_id) == BoardParticipant.Role.owner
+
+    def reset(self):
+        self._roles = None
+
+
+def get_board_roles(request) -> BoardRoles:
+    """
+    Роли текущего пользователя, общие для всех проверок в рамках одного запроса
+    """
+    http_request = getattr(request, "_request", request)
+    board_roles = getattr(http_request, "board_roles", None)
+    if board_roles is None or board_roles.user != request.user:
+        board_roles = BoardRoles(request.user)
+        http_request.board_roles = board_roles
+    return board_roles
@@ -0,0 +1,165 @@
+import re
+from importlib import import_module
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections, transaction
+from django.db.models import BooleanField, CharField, FloatField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+# границы найденных слов в сниппете, после экранирования текста заменяются на <mark>
+MARK_START, MARK_STOP = "\ue000", "\ue001"
+
+WORD_RE = re.compile(r"\w+")
+
+
+def has_terms(query) -> bool:
+    return bool(WORD_RE.search(query or ""))
+
+
+def highlight(snippet) -> str:
+    if snippet is None:
+        return ""
+    return escape(snippet).replace(MARK_START, "<mark>").replace(MARK_STOP, "</mark>")
+
+
+class PostgresSearch:
+    """
+    Поиск по колонке goals_goal.search_vector с GIN индексом (миграция 0014).
+    Запрос разбирается websearch_to_tsquery: "фраза", or, -исключение
+    """
+    config = "russian"
+    headline_options = f"StartSel={MARK_START}, StopSel={MARK_STOP}, MaxFragments=2, MaxWords=20, MinWords=5"
+
+    def match(self, query):
+        return RawSQL(
+            '"goals_goal"."search_vector" @@ websearch_to_tsquery(%s, %s)',
+            (self.config, query), output_field=BooleanField(),
+        )
+
+    def rank(self, query):
+        return RawSQL(
+            'ts_rank_cd("goals_goal"."search_vector", websearch_to_tsquery(%s, %s))',
+            (self.config, query), output_field=FloatField(),
+        )
+
+    def snippet(self, query):
+        return RawSQL(
+            """ts_headline(%s, concat_ws(' ', "goals_goal"."title", "goals_goal"."description",
+                (SELECT string_agg(text, ' ') FROM goals_goalcomment WHERE goal_id = "goals_goal"."id")),
+                websearch_to_tsquery(%s, %s), %s)""",
+            (self.config, self.config, query, self.headline_options), output_field=CharField(),
+        )
+
+
+class SQLiteSearch:
+    """
+    Запасной поиск для локальной разработки и тестов по таблице FTS5 goals_goal_fts.
+    Каждое слово запроса ищется как префикс, все слова обязательны
+    """
+    weights = "10.0, 5.0, 1.0"
+
+    def fts_query(self, query) -> str:
+        return " ".join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+    def match(self, query):
+        return RawSQL(
+            '"goals_goal"."id" IN (SELECT rowid FROM goals_goal_fts WHERE goals_goal_fts MATCH %s)',
+            (self.fts_query(query),), output_field=BooleanField(),
+        )
+
+    def rank(self, query):
+        # bm25 тем меньше, чем лучше совпадение
+        return RawSQL(
+            f'(SELECT -bm25(goals_goal_fts, {self.weights}) FROM goals_goal_fts '
+            f'WHERE goals_goal_fts MATCH %s AND rowid = "goals_goal"."id")',
+            (self.fts_query(query),), output_field=FloatField(),
+        )
+
+    def snippet(self, query):
+        return RawSQL(
+            '(SELECT snippet(goals_goal_fts, -1, %s, %s, %s, 16) FROM goals_goal_fts '
+            'WHERE goals_goal_fts MATCH %s AND rowid = "goals_goal"."id")',
+            (MARK_START, MARK_STOP, "…", self.fts_query(query)), output_field=CharField(),
+        )
+
+
+SEARCH_BACKENDS = {
+    "postgresql": PostgresSearch(),
+    "sqlite": SQLiteSearch(),
+}
+
+
+def get_search_backend():
+    try:
+        return SEARCH_BACKENDS[connection.vendor]
+    except KeyError:
+        raise ImproperlyConfigured(f"Полнотекстовый поиск не поддерживается для {connection.vendor}")
+
+
+def reinstall_sqlite_triggers(using="default") -> list:
+    """
+    Ставит заново триггеры goals_goal_fts, потерянные при пересоздании таблиц SQLite, и перестраивает
+    индекс, ведь без триггеров он мог отстать. Возвращает имена восстановленных триггеров
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return []
+    install = import_module("goals.migrations.0014_goal_search")
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {(kind, name) for kind, name in cursor.fetchall()}
+        if ("table", "goals_goal_fts") not in existing:
+            return []
+        missing = [name for name in install.SQLITE_TRIGGERS if ("trigger", name) not in existing]
+        if missing:
+            with transaction.atomic(using=using):
+                for name in missing:
+                    cursor.execute(install.SQLITE_TRIGGERS[name])
+                cursor.execute("DELETE FROM goals_goal_fts WHERE rowid NOT IN (SELECT id FROM goals_goal)")
+                cursor.execute(install.SQLITE_BACKFILL, (0, 2 ** 63 - 1))
+    return missing
+
+
+def filter_goals(queryset, query):
+    """
+    Цели queryset, в заголовке, описании или комментариях которых есть слова query
+    """
+    if not has_terms(query):
+        return queryset.none()
+    return queryset.filter(get_search_backend().match(query))
+
+
+class SearchResults:
+    """
+    Найденные цели для LimitOffsetPagination. count() считает совпадения без релевантности,
+    срез сортирует по rank, а сниппеты строит отдельным запросом только для целей среза
+    """
+    def __init__(self, queryset, query):
+        self.matches = filter_goals(queryset, query)
+        self.query = query
+
+    def count(self) -> int:
+        return self.matches.count()
+
+    def __getitem__(self, item):
+        backend = get_search_backend()
+        goals = list(self.matches.annotate(rank=backend.rank(self.query)).order_by("-rank", "-id")[item])
+        snippets = dict(
+            self.matches.model.objects.filter(id__in=[goal.id for goal in goals])
+            .annotate(snippet=backend.snippet(self.query))
+            .values_list("id", "snippet")
+        ) if goals else {}
+        for goal in goals:
+            goal.snippet = snippets.get(goal.id)
+        return goals
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+def search_goals(queryset, query) -> SearchResults:
+    """
+    То же, что filter_goals, с релевантностью rank и сниппетом snippet, лучшие совпадения первыми
+    """
+    return SearchResults(queryset, query)
@@ -1,9 +1,16 @@
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from core.models import User
 from core.serializers import UserSerializer
-from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant
+from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant, Tombstone, GoalImportJob, \
+    GoalCounter
+from goals.cache import invalidate_board_data, invalidate_memberships
+from goals.counters import count_goals
+from goals.roles import get_board_roles
+from goals.search import highlight
 
 
 class GoalCategoryCreateSerializer(serializers.ModelSerializer):
@@ -17,11 +24,7 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
     def validate_board(self, value):
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленной доске")
-        if not BoardParticipant.objects.filter(
-                board=value,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context["request"].user,
-        ).exists():
+        if not get_board_roles(self.context["request"]).can_write(value.id):
             raise serializers.ValidationError("Вы должны быть владельцем или редактором доски для этого")
         return value
 
@@ -48,16 +51,13 @@ class GoalCreateSerializer(serializers.ModelSerializer):
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленной категории")
 
-        if not BoardParticipant.objects.filter(
-                board_id=value.board_id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context["request"].user,
-        ).exists():
+        if not get_board_roles(self.context["request"]).can_write(value.board_id):
             raise serializers.ValidationError("Вы должны быть владельцем или редактором доски для этого")
         return value
 
-    category = serializers.PrimaryKeyRelatedField(queryset=GoalCategory.objects.all())
-    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
+class GoalSerializer(serializers.ModelSerializer):
+    user = UserSerializer(read_only=True)
 
     class Meta:
         model = Goal
@@ -68,33 +68,199 @@ class GoalCreateSerializer(serializers.ModelSerializer):
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленной категории")
 
-        if not BoardParticipant.objects.filter(
-                board=value,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context["request"].user,
-        ).exists():
-            raise serializers.ValidationError("Вы должны быть владельцем или редактором доски для этого")
+        if self.instance.board_id != value.board_id:
+            raise serializers.ValidationError("Не разрешено переносить между досками")
         return value
 
 
-class GoalSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+class GoalSnapshotSerializer(GoalSerializer):
+    comment_count = serializers.IntegerField(read_only=True)
+
+
+class GoalSearchSerializer(GoalSerializer):
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.SerializerMethodField()
+
+    def get_snippet(self, obj) -> str:
+        return highlight(obj.snippet)
+
+
+class GoalBulkItemSerializer(serializers.ModelSerializer):
+    category = serializers.IntegerField()
 
     class Meta:
         model = Goal
-        read_only_fields = ('id', 'created', 'updated', 'user')
-        fields = '__all__'
+        fields = ("title", "description", "due_date", "status", "priority", "category")
+
+
+class GoalBulkCreateSerializer(serializers.Serializer):
+    """
+    Массовое создание целей в разных категориях.
+    Категории и права проверяются одним запросом, цели вставляются через bulk_create.
+    При skip_invalid некорректные элементы пропускаются, иначе не создается ничего.
+    Ошибки возвращаются списком по порядку элементов, как у many=True
+    """
+    goals = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=settings.GOALS_BULK_MAX_ITEMS
+    )
+    skip_invalid = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        items, errors = [], {}
+        for index, data in enumerate(attrs["goals"]):
+            item = GoalBulkItemSerializer(data=data)
+            if item.is_valid():
+                items.append((index, item.validated_data))
+            else:
+                errors[index] = item.errors
+
+        categories = {
+            category_id: (board_id, is_deleted)
+            for category_id, board_id, is_deleted in GoalCategory.objects.filter(
+                id__in={data["category"] for _, data in items}
+            ).values_list("id", "board_id", "is_deleted")
+        }
+        roles = get_board_roles(self.context["request"])
+        valid = []
+        for index, data in items:
+            board_id, is_deleted = categories.get(data["category"], (None, False))
+            if board_id is None:
+                error = "Категория не найдена"
+            elif is_deleted:
+                error = "Не разрешено в удаленной категории"
+            elif not roles.can_write(board_id):
+                error = "Вы должны быть владельцем или редактором доски для этого"
+            else:
+                valid.append({**data, "board": board_id})
+                continue
+            errors[index] = {"category": [error]}
+
+        if errors:
+            errors = [errors.get(index, {}) for index in range(len(attrs["goals"]))]
+            if not attrs["skip_invalid"]:
+                raise serializers.ValidationError({"goals": errors})
+        attrs["valid"] = valid
+        attrs["errors"] = errors or []
+        return attrs
 
-    def validate_category(self, value):
-        if value.is_deleted:
-            raise serializers.ValidationError("Не разрешено в удаленной категории")
+    def create(self, validated_data):
+        user = self.context["request"].user
+        now = timezone.now()
+        goals = [
+            Goal(
+                **{key: value for key, value in data.items() if key not in ("category", "board")},
+                category_id=data["category"],
+                board_id=data["board"],
+                user=user,
+                created=now,
+                updated=now,
+            )
+            for data in validated_data["valid"]
+        ]
+        with transaction.atomic():
+            goals = Goal.objects.bulk_create(goals)
+            GoalCounter.apply(count_goals(goals))
+            invalidate_board_data(goal.board_id for goal in goals)
+        return goals
+
+
+class GoalBulkUpdateSerializer(serializers.Serializer):
+    """
+    Поля для массового обновления целей. Цели выбираются списком ids
+    или фильтрами GoalDateFilter в строке запроса
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=settings.GOALS_BULK_MAX_ITEMS
+    )
+    status = serializers.ChoiceField(choices=Goal.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, required=False)
+    due_date = serializers.DateField(required=False, allow_null=True)
 
-        if self.instance.category.board_id != value.board_id:
-            raise serializers.ValidationError("Не разрешено переносить между досками")
+    def validate(self, attrs):
+        if not set(attrs) - {"ids"}:
+            raise serializers.ValidationError("Не указаны поля для изменения")
+        return attrs
+
+
+class GoalBulkArchiveSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=settings.GOALS_BULK_MAX_ITEMS
+    )
+
+    def validate(self, attrs):
+        attrs["status"] = Goal.Status.archived
+        return attrs
+
+
+class GoalImportCommentSerializer(serializers.Serializer):
+    text = serializers.CharField()
+    created = serializers.DateTimeField(required=False)
+
+
+class GoalImportRowSerializer(serializers.Serializer):
+    """
+    Строка импорта в формате выгрузки goal/export.
+    Категория ищется по названию внутри доски, id из файла не используются
+    """
+    board = serializers.IntegerField(required=False)
+    category_title = serializers.CharField(max_length=255)
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    due_date = serializers.DateField(required=False, allow_null=True)
+    status = serializers.ChoiceField(choices=Goal.Status.choices, default=Goal.Status.to_do)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, default=Goal.Priority.medium)
+    created = serializers.DateTimeField(required=False)
+    comments = GoalImportCommentSerializer(many=True, required=False)
+
+    def validate(self, attrs):
+        if "board" not in attrs:
+            raise serializers.ValidationError({"board": ["Обязательное поле."]})
+        return attrs
+
+
+class GoalImportSerializer(serializers.Serializer):
+    """
+    Файл импорта. Формат берется из file_format или из расширения файла.
+    Чтобы продолжить прерванный импорт, передается job и тот же файл
+    """
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(choices=GoalImportJob.Format.choices, required=False)
+    board = serializers.PrimaryKeyRelatedField(queryset=Board.objects.filter(is_deleted=False), required=False)
+    job = serializers.IntegerField(required=False)
+
+    def validate_board(self, value):
+        if not get_board_roles(self.context["request"]).can_write(value.id):
+            raise serializers.ValidationError("Вы должны быть владельцем или редактором доски для этого")
         return value
 
+    def validate(self, attrs):
+        if "job" in attrs:
+            attrs["job"] = GoalImportJob.objects.filter(
+                id=attrs["job"], user=self.context["request"].user, is_done=False
+            ).first()
+            if attrs["job"] is None:
+                raise serializers.ValidationError({"job": ["Незавершенный импорт не найден"]})
+        if "file_format" not in attrs:
+            name = attrs["file"].name.lower()
+            attrs["file_format"] = GoalImportJob.Format.csv if name.endswith(".csv") else GoalImportJob.Format.ndjson
+        return attrs
+
+    def create(self, validated_data):
+        job = validated_data.get("job")
+        if job is None:
+            job = GoalImportJob(
+                user=self.context["request"].user,
+                board=validated_data.get("board"),
+                format=validated_data["file_format"],
+                source=validated_data["file"].name[:255],
+            )
+            job.save()
+        return job
+
 
 class CommentCreateSerializer(serializers.ModelSerializer):
+    # цели удаленных категорий комментировать нельзя, как и создавать в них цели
+    goal = serializers.PrimaryKeyRelatedField(queryset=Goal.objects.filter(category__is_deleted=False))
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
     class Meta:
@@ -103,12 +269,9 @@ class CommentCreateSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
     def validate_goal(self, value):
-        if not BoardParticipant.objects.filter(
-            board_id=value.category.board_id,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-            user=self.context["request"].user,
-        ).exists():
+        if not get_board_roles(self.context["request"]).can_write(value.board_id):
             raise serializers.ValidationError("Вы должны быть владельцем или редактором доски для этого")
+        return value
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -134,14 +297,27 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         BoardParticipant.objects.create(
             user=user, board=board, role=BoardParticipant.Role.owner
         )
+        invalidate_memberships(user_ids=[user.id])
+        get_board_roles(self.context["request"]).reset()
         return board
 
 
+class UsernameField(serializers.SlugRelatedField):
+    """
+    Логин пользователя. На входе остается строкой,
+    пользователи загружаются одним запросом в BoardSerializer.validate_participants
+    """
+    def to_internal_value(self, data):
+        if not isinstance(data, str) or not data:
+            self.fail("invalid")
+        return data
+
+
 class BoardParticipantSerializer(serializers.ModelSerializer):
     role = serializers.ChoiceField(
         required=True, choices=BoardParticipant.editable_choices
     )
-    user = serializers.SlugRelatedField(
+    user = UsernameField(
         slug_field="username",
         queryset=User.objects.all()
     )
@@ -153,7 +329,8 @@ class BoardParticipantSerializer(serializers.ModelSerializer):
 
 
 class BoardSerializer(serializers.ModelSerializer):
-    participants = BoardParticipantSerializer(many=True)
+    # список загружает BoardView через Prefetch(..., to_attr="participant_list")
+    participants = BoardParticipantSerializer(many=True, source="participant_list")
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
     class Meta:
@@ -161,34 +338,58 @@ class BoardSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created", "updated")
         fields = "__all__"
 
+    def validate_participants(self, value):
+        usernames = {part["user"] for part in value}
+        users = User.objects.in_bulk(usernames, field_name="username")
+        unknown = sorted(usernames - users.keys())
+        if unknown:
+            raise serializers.ValidationError(f"Пользователи не найдены: {', '.join(unknown)}")
+        return [{**part, "user": users[part["user"]]} for part in value]
+
     def update(self, instance, validated_data):
         owner = validated_data.pop("user")
-        new_participants = validated_data.pop("participants")
-        new_by_id = {
-            part["user"].id: part for part in new_participants
+        new_roles = {
+            part["user"].id: part["role"]
+            for part in validated_data.pop("participant_list")
+            if part["user"].id != owner.id
         }
+        now = timezone.now()
 
-        old_participants = instance.participants.exclude(user=owner)
         with transaction.atomic():
-            for old_participant in old_participants:
-                if old_participant.user_id not in new_by_id:
-                    old_participant.delete()
-                else:
-                    if (
-                            old_participant.role != new_by_id[old_participant.user_id]["role"]
-                    ):
-                        old_participant.role = new_by_id[old_participant.user_id][
-                            "role"
-                        ]
-                        old_participant.save()
-                    new_by_id.pop(old_participant.user_id)
-            for new_part in new_by_id.values():
-                BoardParticipant.objects.create(
-                    board=instance, user=new_part["user"], role=new_part["role"]
-                )
+            # условный UPDATE доски идет первым: при конфликте версий участники не трогаются,
+            # а до конца транзакции строка доски заблокирована для других изменений
             instance.title = validated_data["title"]
             instance.save()
 
+            old_participants = list(instance.participants.exclude(user=owner).values_list("id", "user_id", "role"))
+            old_roles = {user_id: role for _, user_id, role in old_participants}
+            removed = old_roles.keys() - new_roles.keys()
+            added = new_roles.keys() - old_roles.keys()
+            changed = {
+                user_id for user_id in old_roles.keys() & new_roles.keys()
+                if old_roles[user_id] != new_roles[user_id]
+            }
+
+            if removed:
+                instance.participants.filter(user_id__in=removed).delete()
+                Tombstone.record(
+                    Tombstone.Kind.participant,
+                    instance.id,
+                    [participant_id for participant_id, user_id, _ in old_participants if user_id in removed],
+                )
+                for user_id in removed:
+                    Tombstone.record(Tombstone.Kind.board, instance.id, [instance.id], user_id=user_id)
+            for role in {new_roles[user_id] for user_id in changed}:
+                instance.participants.filter(
+                    user_id__in=[user_id for user_id in changed if new_roles[user_id] == role]
+                ).update(role=role, updated=now)
+            BoardParticipant.objects.bulk_create([
+                BoardParticipant(board=instance, user_id=user_id, role=new_roles[user_id], created=now, updated=now)
+                for user_id in added
+            ])
+
+            invalidate_memberships(user_ids=removed | added | changed)
+
         return instance
 
 
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from goals.cache import invalidate_board_data
+from goals.models import Board, BoardParticipant, GoalCategory, Goal, GoalComment
+from goals.search import reinstall_sqlite_triggers
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def board_changed(sender, instance, **kwargs):
+    invalidate_board_data([instance.pk])
+
+
+@receiver(post_save, sender=BoardParticipant)
+@receiver(post_delete, sender=BoardParticipant)
+@receiver(post_save, sender=GoalCategory)
+@receiver(post_delete, sender=GoalCategory)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+@receiver(post_save, sender=GoalComment)
+@receiver(post_delete, sender=GoalComment)
+def board_content_changed(sender, instance, **kwargs):
+    invalidate_board_data([instance.board_id])
+
+
+def search_triggers_migrated(sender, using, **kwargs):
+    # подключается в GoalsConfig.ready() к post_migrate приложения goals
+    reinstall_sqlite_triggers(using)
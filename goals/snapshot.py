@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db.models import Count
+
+from goals.models import Board, BoardParticipant, GoalCategory, Goal
+from goals.pagination import GoalPagination, ordering_expressions
+from goals.serializers import BoardListSerializer, BoardParticipantSerializer, GoalCategorySerializer, \
+    GoalSnapshotSerializer
+
+
+def capped(queryset, limit, serializer_class) -> dict:
+    items = list(queryset[:limit + 1])
+    return {
+        "results": serializer_class(items[:limit], many=True).data,
+        "has_more": len(items) > limit,
+    }
+
+
+def build_snapshot(board_id, limit=None):
+    """
+    Доска, участники, живые категории и цели с числом комментариев, по запросу на раздел.
+    Права проверяет вызывающий код. Каждый раздел ограничен limit строк,
+    has_more показывает, что остаток нужно получить через списки
+    """
+    limit = limit or settings.GOALS_SNAPSHOT_LIMIT
+    board = Board.objects.filter(pk=board_id, is_deleted=False).first()
+    if board is None:
+        return None
+
+    participants = BoardParticipant.objects.filter(board_id=board_id).select_related("user").order_by("id")
+    categories = GoalCategory.objects.filter(board_id=board_id, is_deleted=False).select_related("user").order_by(
+        "title", "id"
+    )
+    goals = Goal.objects.filter(
+        board_id=board_id, category__is_deleted=False
+    ).select_related("user").annotate(
+        comment_count=Count("goal_comments")
+    ).order_by(*ordering_expressions(GoalPagination.ordering))
+    return {
+        "board": BoardListSerializer(board).data,
+        "participants": capped(participants, limit, BoardParticipantSerializer),
+        "categories": capped(categories, limit, GoalCategorySerializer),
+        "goals": capped(goals, limit, GoalSnapshotSerializer),
+    }
@@ -0,0 +1,165 @@
+import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from goals.models import Board, BoardParticipant, GoalCategory, Goal, GoalComment, Tombstone
+from goals.pagination import keyset_q
+from goals.serializers import BoardListSerializer, BoardParticipantSerializer, GoalCategorySerializer, \
+    GoalSerializer, CommentSerializer
+
+SYNC_ORDERING = ("updated", "id")
+SYNC_SALT = "goals.sync"
+
+TOMBSTONE_SECTIONS = {
+    Tombstone.Kind.board: "boards",
+    Tombstone.Kind.participant: "participants",
+    Tombstone.Kind.comment: "comments",
+}
+
+
+def stamp_before_commit(*querysets):
+    """
+    Ставит updated = сейчас строкам долгой транзакции последним шагом перед коммитом.
+    Курсор синхронизации идет по updated, и строки с датой начала транзакции, закоммиченные
+    позже GOALS_SYNC_LAG, оказались бы позади курсоров, уже выданных клиентам
+    """
+    now = timezone.now()
+    for queryset in querysets:
+        queryset.update(updated=now)
+
+
+def get_sections(user, board_ids=None):
+    """
+    Запросы по каждому типу объектов, видимых пользователю, включая удаленные.
+    С board_ids только содержимое этих досок, без удалений
+    """
+    visible_ids = Board.objects.visible_to(user).values("id")
+    sections = {
+        "boards": Board.objects.visible_to(user),
+        "participants": BoardParticipant.objects.filter(board_id__in=visible_ids).select_related("user"),
+        "categories": GoalCategory.objects.visible_to(user).select_related("user"),
+        "goals": Goal.objects.visible_to(user).select_related("user"),
+        "comments": GoalComment.objects.visible_to(user).select_related("user"),
+    }
+    if board_ids is not None:
+        return {
+            section: queryset.filter(**{"id__in" if section == "boards" else "board_id__in": board_ids})
+            for section, queryset in sections.items()
+        }
+    sections["tombstones"] = Tombstone.objects.filter(Q(user=user) | Q(user__isnull=True, board_id__in=visible_ids))
+    return sections
+
+
+def dump_positions(positions) -> dict:
+    return {section: [updated.isoformat(), obj_id] for section, (updated, obj_id) in positions.items()}
+
+
+def load_positions(data) -> dict:
+    positions = {section: [parse_datetime(updated), int(obj_id)] for section, (updated, obj_id) in data.items()}
+    if any(updated is None for updated, _ in positions.values()):
+        raise ValueError
+    return positions
+
+
+def encode_cursor(user, positions, known, fill) -> str:
+    payload = {"u": user.id, "p": dump_positions(positions), "b": sorted(known)}
+    if fill is not None:
+        payload["f"] = {"ids": fill["ids"], "p": dump_positions(fill["p"])}
+    return signing.dumps(payload, salt=SYNC_SALT, compress=True)
+
+
+def decode_cursor(user, token) -> tuple:
+    """
+    Позиции разделов, доски, содержимое которых клиент уже получил (None у первого запроса),
+    и незаконченная догрузка новых досок
+    """
+    if not token:
+        return {}, None, None
+    try:
+        payload = signing.loads(token, salt=SYNC_SALT)
+        if payload["u"] != user.id:
+            raise ValueError
+        fill = payload.get("f")
+        if fill is not None:
+            fill = {"ids": [int(board_id) for board_id in fill["ids"]], "p": load_positions(fill["p"])}
+        return load_positions(payload["p"]), {int(board_id) for board_id in payload["b"]}, fill
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise ValidationError({"cursor": "Неверный курсор"})
+
+
+def read_section(queryset, positions, section, upper, limit) -> tuple:
+    """
+    Строки раздела после позиции курсора и признак, что за ними есть еще. Позиция сдвигается
+    """
+    queryset = queryset.filter(updated__lte=upper)
+    if section in positions:
+        queryset = queryset.filter(keyset_q(SYNC_ORDERING, positions[section]))
+    items = list(queryset.order_by(*SYNC_ORDERING)[:limit + 1])
+    if items[:limit]:
+        last = items[:limit][-1]
+        positions[section] = [last.updated, last.id]
+    return items[:limit], len(items) > limit
+
+
+def deleted_item(obj):
+    return {"id": obj.id, "updated": obj.updated}
+
+
+def build_sync(user, token=None, limit=None) -> dict:
+    """
+    Изменения, видимые пользователю после курсора, по (updated, id) в каждом разделе.
+    Строки моложе GOALS_SYNC_LAG попадут в следующий ответ, чтобы не пропустить транзакции, которые
+    еще коммитятся; долгие транзакции ставят updated перед коммитом (stamp_before_commit).
+    Доски, доступ к которым появился после курсора, догружаются целиком своими позициями,
+    когда основные изменения прочитаны, ведь их старые строки лежат до курсора.
+    Удаления возвращаются с датой, клиент применяет их, если они новее объекта
+    """
+    limit = limit or settings.GOALS_SYNC_LIMIT
+    positions, known, fill = decode_cursor(user, token)
+    upper = timezone.now() - datetime.timedelta(seconds=settings.GOALS_SYNC_LAG)
+    visible = set(Board.objects.visible_to(user).values_list("id", flat=True))
+    known = visible if known is None else known & visible
+    if fill is None and visible - known:
+        fill = {"ids": sorted(visible - known), "p": {}}
+
+    rows, has_more = {}, False
+    for section, queryset in get_sections(user).items():
+        rows[section], more = read_section(queryset, positions, section, upper, limit)
+        has_more = has_more or more
+
+    if fill is not None and not has_more:
+        for section, queryset in get_sections(user, fill["ids"]).items():
+            items, more = read_section(queryset, fill["p"], section, upper, limit)
+            seen = {item.id for item in rows[section]}
+            rows[section] += [item for item in items if item.id not in seen]
+            has_more = has_more or more
+        if not has_more:
+            known |= set(fill["ids"])
+            fill = None
+
+    deleted = {
+        "boards": [deleted_item(board) for board in rows["boards"] if board.is_deleted],
+        "categories": [deleted_item(category) for category in rows["categories"] if category.is_deleted],
+        "participants": [],
+        "comments": [],
+    }
+    for tombstone in rows["tombstones"]:
+        deleted[TOMBSTONE_SECTIONS[tombstone.kind]].append({"id": tombstone.object_id, "updated": tombstone.updated})
+
+    return {
+        "cursor": encode_cursor(user, positions, known, fill),
+        "has_more": has_more,
+        "boards": BoardListSerializer([board for board in rows["boards"] if not board.is_deleted], many=True).data,
+        "participants": BoardParticipantSerializer(rows["participants"], many=True).data,
+        "categories": GoalCategorySerializer(
+            [category for category in rows["categories"] if not category.is_deleted], many=True
+        ).data,
+        "goals": GoalSerializer(rows["goals"], many=True).data,
+        "comments": CommentSerializer(rows["comments"], many=True).data,
+        "deleted": deleted,
+    }
@@ -7,7 +7,13 @@ urlpatterns = [
     path("goal_category/list", views.GoalCategoryListView.as_view()),
     path("goal_category/<int:pk>", views.GoalCategoryView.as_view()),
     path("goal/create", views.GoalCreateView.as_view()),
+    path("goal/bulk_create", views.GoalBulkCreateView.as_view()),
+    path("goal/bulk_update", views.GoalBulkUpdateView.as_view()),
+    path("goal/bulk_archive", views.GoalBulkArchiveView.as_view()),
     path("goal/list", views.GoalListView.as_view()),
+    path("goal/search", views.GoalSearchView.as_view()),
+    path("goal/export", views.GoalExportView.as_view()),
+    path("goal/import", views.GoalImportView.as_view()),
     path("goal/<int:pk>", views.GoalView.as_view()),
     path("goal_comment/create", views.CommentCreateView.as_view()),
     path("goal_comment/list", views.CommentListView.as_view()),
@@ -15,4 +21,12 @@ urlpatterns = [
     path("board/create", views.BoardCreateView.as_view()),
     path("board/list", views.BoardListView.as_view()),
     path("board/<int:pk>", views.BoardView.as_view()),
+    path("board/<int:pk>/snapshot", views.BoardSnapshotView.as_view()),
+    path("board/<int:pk>/summary", views.BoardSummaryView.as_view()),
+    path("board/<int:board_pk>/categories", views.GoalCategoryListView.as_view()),
+    path("board/<int:board_pk>/goals", views.GoalListView.as_view()),
+    path("board/<int:board_pk>/comments", views.CommentListView.as_view()),
+    path("sync", views.SyncView.as_view()),
+    path("autocomplete", views.AutocompleteView.as_view()),
+    path("cache/stats", views.ResponseCacheStatsView.as_view()),
 ]
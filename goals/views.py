@@ -1,15 +1,53 @@
+import io
+
+from django.conf import settings
 from django.db import transaction
+from django.db.models import F, Prefetch, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import permissions, filters
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework import permissions, filters, status
+from rest_framework.generics import CreateAPIView, GenericAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import LimitOffsetPagination
-
-from goals.filters import GoalDateFilter
-from goals.models import GoalCategory, Goal, GoalComment, Board
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from goals.archive import start_archive_job
+from goals.autocomplete import autocomplete
+from goals.cache import invalidate_board_data, invalidate_memberships
+from goals.conditional import ConditionalListMixin, ConditionalRetrieveMixin, VersionedUpdateMixin
+from goals.counters import build_summary, lock_goals, move_deltas
+from goals.export import EXPORT_FORMATS, goal_rows
+from goals.filters import GoalDateFilter, GoalExportFilter, GoalSearchFilter
+from goals.importer import GoalImporter
+from goals.lean import LeanListMixin
+from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant, Tombstone, GoalCounter
+from goals.pagination import GoalPagination, CommentPagination, get_limit
 from goals.permissions import BoardPermissions, GoalCategoryPermissions, GoalPermissions, CommentPermissions
+from goals.response_cache import CachedListMixin, get_stats
+from goals.roles import get_board_roles
+from goals.search import has_terms, search_goals
 from goals.serializers import GoalCategoryCreateSerializer, GoalCategorySerializer, GoalCreateSerializer, \
     GoalSerializer, CommentCreateSerializer, CommentSerializer, BoardSerializer, BoardListSerializer, \
-    BoardCreateSerializer
+    BoardCreateSerializer, GoalBulkCreateSerializer, GoalBulkUpdateSerializer, GoalBulkArchiveSerializer, \
+    GoalImportSerializer, GoalSearchSerializer
+from goals.snapshot import build_snapshot
+from goals.sync import build_sync
+
+
+class BoardScopedMixin:
+    """
+    Списки по доскам пользователя или, для маршрутов board/<board_pk>/..., по одной доске.
+    Во втором случае участие проверяется один раз по карте ролей и остается фильтр по доске
+    """
+    def scope(self, queryset):
+        board_id = self.kwargs.get("board_pk")
+        if board_id is None:
+            return queryset.visible_to(self.request.user)
+        if not get_board_roles(self.request).can_read(board_id):
+            raise NotFound
+        return queryset.on_board(board_id)
 
 
 class GoalCategoryCreateView(CreateAPIView):
@@ -18,37 +56,42 @@ class GoalCategoryCreateView(CreateAPIView):
     serializer_class = GoalCategoryCreateSerializer
 
 
-class GoalCategoryListView(ListAPIView):
+class GoalCategoryListView(BoardScopedMixin, ConditionalListMixin, CachedListMixin, LeanListMixin, ListAPIView):
     model = GoalCategory
     permission_classes = [permissions.IsAuthenticated, ]
     serializer_class = GoalCategorySerializer
     pagination_class = LimitOffsetPagination
     filter_backends = [
+        DjangoFilterBackend,
         filters.OrderingFilter,
         filters.SearchFilter,
     ]
-    filterset_fields = ["boards", "user"]
+    filterset_fields = ["board", "user"]
     ordering_fields = ["title", "date_created"]
     ordering = ["title"]
     search_fields = ["title"]
 
     def get_queryset(self):
-        return GoalCategory.objects.filter(board__participants__user=self.request.user, is_deleted=False)
+        return self.scope(GoalCategory.objects.all()).filter(
+            is_deleted=False
+        ).select_related("user")
 
 
-class GoalCategoryView(RetrieveUpdateDestroyAPIView):
+class GoalCategoryView(VersionedUpdateMixin, RetrieveUpdateDestroyAPIView):
     model = GoalCategory
     permission_classes = [permissions.IsAuthenticated, GoalCategoryPermissions]
     serializer_class = GoalCategorySerializer
 
     def get_queryset(self):
-        return GoalCategory.objects.filter(board__participants__user=self.request.user, is_deleted=False)
+        return GoalCategory.objects.visible_to(self.request.user).filter(
+            is_deleted=False
+        ).select_related("user")
 
     def perform_destroy(self, instance):
         with transaction.atomic():
             instance.is_deleted = True
             instance.save()
-            Goal.objects.filter(category=instance).update(status=Goal.Status.archived)
+            start_archive_job(category=instance)
         return instance
 
 
@@ -58,13 +101,84 @@ class GoalCreateView(CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class GoalView(RetrieveUpdateDestroyAPIView):
+class GoalBulkCreateView(GenericAPIView):
+    serializer_class = GoalBulkCreateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer: GoalBulkCreateSerializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        goals = serializer.save()
+        return Response(
+            {
+                "created": GoalSerializer(goals, many=True).data,
+                "errors": serializer.validated_data["errors"],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class GoalBulkUpdateView(GenericAPIView):
+    """
+    Массовое изменение целей одним UPDATE. Цели выбираются по ids из тела запроса
+    или фильтрами GoalDateFilter, изменяются только цели досок, где пользователь может писать
+    """
+    serializer_class = GoalBulkUpdateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = GoalDateFilter
+
+    def get_queryset(self):
+        return Goal.objects.visible_to(self.request.user, min_role=BoardParticipant.Role.writer).filter(
+            category__is_deleted=False
+        )
+
+    def filter_by_params(self):
+        """
+        Цели по фильтрам запроса. Пустые значения django-filter пропускает,
+        поэтому нужен хотя бы один непустой фильтр, иначе изменились бы все цели пользователя
+        """
+        filterset = DjangoFilterBackend().get_filterset(self.request, self.get_queryset(), self)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        if all(value in (None, "", [], ()) for value in filterset.form.cleaned_data.values()):
+            raise ValidationError("Укажите ids или фильтры для выбора целей")
+        return filterset.qs
+
+    def patch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        fields = dict(serializer.validated_data)
+        ids = fields.pop("ids", None)
+
+        if ids is not None:
+            queryset = self.get_queryset().filter(id__in=ids)
+        else:
+            queryset = self.filter_by_params()
+
+        with transaction.atomic():
+            queryset = lock_goals(queryset)
+            deltas = move_deltas(queryset, **fields)
+            updated = queryset.update(**fields, updated=timezone.now(), version=F("version") + 1)
+            GoalCounter.apply(deltas)
+            invalidate_board_data(key[0] for key in deltas)
+        return Response({"updated": updated})
+
+
+class GoalBulkArchiveView(GoalBulkUpdateView):
+    serializer_class = GoalBulkArchiveSerializer
+
+
+class GoalView(VersionedUpdateMixin, RetrieveUpdateDestroyAPIView):
     model = Goal
     serializer_class = GoalSerializer
     permission_classes = [permissions.IsAuthenticated, GoalPermissions]
 
     def get_queryset(self):
-        return Goal.objects.filter(category__board__participants__user=self.request.user)
+        # как в GoalListView: цели удаленных категорий и досок скрыты до того, как их заархивирует задание
+        return Goal.objects.visible_to(self.request.user).filter(
+            category__is_deleted=False
+        ).select_related("user", "category")
 
     def perform_destroy(self, instance):
         instance.status = Goal.Status.archived
@@ -72,23 +186,90 @@ class GoalView(RetrieveUpdateDestroyAPIView):
         return instance
 
 
-class GoalListView(ListAPIView):
+class GoalListView(BoardScopedMixin, ConditionalListMixin, CachedListMixin, LeanListMixin, ListAPIView):
     model = Goal
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = GoalPagination
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        GoalSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_class = GoalDateFilter
-    search_fields = ["title", "description"]
     ordering_fields = ["due_date", "priority"]
     ordering = ["priority", "due_date"]
 
     def get_queryset(self):
-        return Goal.objects.filter(category__board__participants__user=self.request.user)
+        # цели удаленных категорий скрыты и до того, как фоновое задание их заархивирует
+        return self.scope(Goal.objects.all()).filter(
+            category__is_deleted=False
+        ).select_related("user", "category")
+
+
+class GoalSearchView(BoardScopedMixin, ListAPIView):
+    """
+    Полнотекстовый поиск целей по ?q= с релевантностью и сниппетами.
+    Видимость та же, что у GoalListView, фильтры из GoalDateFilter тоже работают
+    """
+    model = Goal
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalSearchSerializer
+    pagination_class = LimitOffsetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = GoalDateFilter
+
+    def get_queryset(self):
+        query = self.request.query_params.get("q", "")
+        if not has_terms(query):
+            raise ValidationError({"q": ["Введите слова для поиска"]})
+        return self.scope(Goal.objects.all()).filter(category__is_deleted=False).select_related("user", "category")
+
+    def filter_queryset(self, queryset):
+        # ранжирование после фильтров: пагинация считает совпадения без rank и snippet
+        return search_goals(super().filter_queryset(queryset), self.request.query_params["q"])
+
+
+class GoalExportView(GenericAPIView):
+    """
+    Потоковая выгрузка видимых пользователю целей с комментариями в NDJSON или CSV.
+    Доску и автора можно ограничить параметрами board и user
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = GoalExportFilter
+
+    def get_queryset(self):
+        return Goal.objects.visible_to(self.request.user).filter(category__is_deleted=False)
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({"output": f"Поддерживаются форматы: {', '.join(EXPORT_FORMATS)}"})
+        lines, content_type = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(
+            lines(goal_rows(self.filter_queryset(self.get_queryset()))), content_type=content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="goals.{output}"'
+        return response
+
+
+class GoalImportView(GenericAPIView):
+    """
+    Импорт целей из NDJSON или CSV в формате goal/export.
+    Возвращает отчет с числом строк, скоростью и ошибками по строкам
+    """
+    serializer_class = GoalImportSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        serializer: GoalImportSerializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save()
+        stream = io.TextIOWrapper(serializer.validated_data["file"].file, encoding="utf-8", newline="")
+        report = GoalImporter(job).run(stream)
+        return Response(report, status=status.HTTP_201_CREATED)
 
 
 class CommentCreateView(CreateAPIView):
@@ -97,11 +278,11 @@ class CommentCreateView(CreateAPIView):
     permission_classes = [permissions.IsAuthenticated, ]
 
 
-class CommentListView(ListAPIView):
+class CommentListView(BoardScopedMixin, ConditionalListMixin, CachedListMixin, LeanListMixin, ListAPIView):
     model = GoalComment
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, ]
-    pagination_class = LimitOffsetPagination
+    pagination_class = CommentPagination
     filter_backends = [
         filters.OrderingFilter,
         DjangoFilterBackend
@@ -110,16 +291,25 @@ class CommentListView(ListAPIView):
     ordering = '-id'
 
     def get_queryset(self):
-        return GoalComment.objects.filter(goal__category__board__participants__user=self.request.user)
+        return self.scope(GoalComment.objects.all()).filter(
+            goal__category__is_deleted=False
+        ).select_related("user")
 
 
-class CommentView(RetrieveUpdateDestroyAPIView):
+class CommentView(ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView):
     model = GoalComment
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, CommentPermissions]
 
     def get_queryset(self):
-        return GoalComment.objects.filter(goal__category__board__participants__user=self.request.user)
+        return GoalComment.objects.visible_to(self.request.user).filter(
+            goal__category__is_deleted=False
+        ).select_related("user")
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            Tombstone.record(Tombstone.Kind.comment, instance.board_id, [instance.id])
+            instance.delete()
 
 
 class BoardCreateView(CreateAPIView):
@@ -128,7 +318,7 @@ class BoardCreateView(CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class BoardListView(ListAPIView):
+class BoardListView(ConditionalListMixin, CachedListMixin, LeanListMixin, ListAPIView):
     model = Board
     serializer_class = BoardListSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -139,25 +329,110 @@ class BoardListView(ListAPIView):
     ordering = ["title"]
 
     def get_queryset(self):
-        return Board.objects.filter(
-            participants__user=self.request.user, is_deleted=False
-        )
+        return Board.objects.visible_to(self.request.user).filter(is_deleted=False)
+
+
+def participants_prefetch():
+    return Prefetch(
+        "participants", queryset=BoardParticipant.objects.select_related("user"), to_attr="participant_list"
+    )
 
 
-class BoardView(RetrieveUpdateDestroyAPIView):
+class BoardView(VersionedUpdateMixin, RetrieveUpdateDestroyAPIView):
     model = Board
     serializer_class = BoardSerializer
     permission_classes = [permissions.IsAuthenticated, BoardPermissions]
 
     def get_queryset(self):
-        return Board.objects.filter(participants__user=self.request.user, is_deleted=False)
+        return Board.objects.visible_to(self.request.user).filter(is_deleted=False).prefetch_related(
+            participants_prefetch()
+        )
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        # в ответе новый состав участников, загруженный в get_queryset список устарел
+        del serializer.instance.participant_list
+        prefetch_related_objects([serializer.instance], participants_prefetch())
 
     def perform_destroy(self, instance):
         with transaction.atomic():
             instance.is_deleted = True
             instance.save()
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(
-                status=Goal.Status.archived
-            )
+            instance.categories.update(is_deleted=True, updated=timezone.now(), version=F("version") + 1)
+            start_archive_job(board=instance)
+            invalidate_memberships(board_ids=[instance.id])
         return instance
+
+
+class BoardSnapshotView(GenericAPIView):
+    """
+    Доска со всем содержимым для первого открытия одним ответом
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        roles = get_board_roles(request)
+        if not roles.can_read(pk):
+            raise NotFound
+        snapshot = build_snapshot(pk, get_limit(request, settings.GOALS_SNAPSHOT_LIMIT))
+        if snapshot is None:
+            raise NotFound
+        return Response({**snapshot, "role": roles.role(pk)})
+
+
+class BoardSummaryView(GenericAPIView):
+    """
+    Число целей доски и категорий по статусам, приоритетам и просроченных из GoalCounter
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        if not get_board_roles(request).can_read(pk):
+            raise NotFound
+        summary = build_summary(pk)
+        if summary is None:
+            raise NotFound
+        return Response(summary)
+
+
+class AutocompleteView(GenericAPIView):
+    """
+    Категории и цели досок пользователя, заголовок которых начинается с ?q= или похож на него.
+    ?board= ограничивает одну доску, ?limit= число результатов каждого вида
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "")
+        if not query.strip():
+            raise ValidationError({"q": ["Введите начало названия"]})
+        limit = get_limit(request, settings.GOALS_AUTOCOMPLETE_MAX_LIMIT, settings.GOALS_AUTOCOMPLETE_LIMIT)
+        roles = get_board_roles(request)
+        board_ids = roles.board_ids
+        board = request.query_params.get("board")
+        if board:
+            if not board.isdigit() or not roles.can_read(int(board)):
+                raise NotFound
+            board_ids = [int(board)]
+        return Response(autocomplete(request.user.id, sorted(board_ids), query, limit))
+
+
+class ResponseCacheStatsView(GenericAPIView):
+    """
+    Попадания и промахи кэша ответов списков
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_stats())
+
+
+class SyncView(GenericAPIView):
+    """
+    Изменения с момента курсора для инкрементальной синхронизации клиентов
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        limit = get_limit(request, settings.GOALS_SYNC_LIMIT)
+        return Response(build_sync(request.user, request.query_params.get("cursor"), limit))
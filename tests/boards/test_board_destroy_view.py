@@ -0,0 +1,58 @@
+import pytest
+from django.test import override_settings
+from rest_framework import status
+
+from goals.archive import run_archive_job, run_pending_jobs
+from goals.models import Goal, GoalArchiveJob, GoalCategory
+from tests.factories import GoalFactory
+
+
+@pytest.fixture
+def goals(goal_category):
+    return GoalFactory.create_batch(5, category=goal_category)
+
+
+@pytest.mark.django_db
+def test_board_archived_inline(auth_client, board, board_participant, goals, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        response = auth_client.delete(f"/goals/board/{board.pk}")
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not Goal.objects.exclude(status=Goal.Status.archived).exists()
+    assert not GoalCategory.objects.filter(is_deleted=False).exists()
+    assert GoalArchiveJob.objects.get().is_done
+
+
+@pytest.mark.django_db
+@override_settings(GOALS_ARCHIVE_BATCH_SIZE=2, GOALS_ARCHIVE_INLINE_BATCHES=1)
+def test_category_archived_in_batches(auth_client, goal_category, board_participant, goals,
+                                      django_capture_on_commit_callbacks):
+    # execute=True в Django 4.0 повторно вызывает последний колбэк, если колбэки добавили новые
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = auth_client.delete(f"/goals/goal_category/{goal_category.pk}")
+    for callback in callbacks:
+        callback()
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    job = GoalArchiveJob.objects.get()
+    assert not job.is_done
+    assert Goal.objects.filter(status=Goal.Status.archived).count() == 2
+    assert auth_client.get("/goals/goal/list").json() == []
+
+    assert run_pending_jobs() == 1
+    assert not Goal.objects.exclude(status=Goal.Status.archived).exists()
+
+
+@pytest.mark.django_db
+def test_resume_after_crash(goal_category, goals):
+    goal_category.is_deleted = True
+    goal_category.save()
+    job = GoalArchiveJob(category=goal_category, last_goal_id=goals[2].id)
+    job.save()
+
+    assert run_archive_job(job.id, batch_size=2)
+
+    job.refresh_from_db()
+    assert job.is_done
+    assert job.last_goal_id == goals[-1].id
+    assert list(Goal.objects.filter(status=Goal.Status.archived).order_by("id")) == goals[3:]
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from django.test import Client
+from rest_framework import status
+
+from goals.models import BoardParticipant
+from tests.factories import UserFactory, BoardParticipantFactory
+
+
+@pytest.fixture
+def member(board):
+    participant = BoardParticipantFactory(board=board, user=UserFactory(), role=BoardParticipant.Role.writer)
+    return participant.user
+
+
+@pytest.fixture
+def member_client(member):
+    member_client = Client()
+    member_client.force_login(member)
+    return member_client
+
+
+def share(client, board, participants):
+    return client.put(
+        f"/goals/board/{board.pk}",
+        json.dumps({"title": board.title, "participants": participants}),
+        content_type="application/json",
+    )
+
+
+def update_goal(client, goal):
+    return client.patch(f"/goals/goal/{goal.pk}", json.dumps({"title": "new"}), content_type="application/json")
+
+
+@pytest.mark.django_db
+def test_removed_participant_loses_access(auth_client, member_client, goal, board, board_participant):
+    assert update_goal(member_client, goal).status_code == status.HTTP_200_OK
+
+    assert share(auth_client, board, []).status_code == status.HTTP_200_OK
+
+    assert update_goal(member_client, goal).status_code == status.HTTP_404_NOT_FOUND
+    assert member_client.get(f"/goals/board/{board.pk}").status_code == status.HTTP_404_NOT_FOUND
+    response = member_client.post("/goals/goal/create", {"title": "new", "category": goal.category_id})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_downgraded_participant_cannot_write(auth_client, member_client, member, goal, board, board_participant):
+    assert update_goal(member_client, goal).status_code == status.HTTP_200_OK
+
+    participants = [{"user": member.username, "role": BoardParticipant.Role.reader}]
+    assert share(auth_client, board, participants).status_code == status.HTTP_200_OK
+
+    assert update_goal(member_client, goal).status_code == status.HTTP_403_FORBIDDEN
+    assert member_client.get(f"/goals/goal/{goal.pk}").status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_deleted_board(auth_client, member_client, goal, board, board_participant):
+    assert member_client.get(f"/goals/board/{board.pk}").status_code == status.HTTP_200_OK
+
+    assert auth_client.delete(f"/goals/board/{board.pk}").status_code == status.HTTP_204_NO_CONTENT
+
+    assert member_client.get(f"/goals/board/{board.pk}").status_code == status.HTTP_404_NOT_FOUND
+    response = member_client.post("/goals/goal_category/create", {"title": "new", "board": board.pk})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_new_board_is_writable_at_once(auth_client, user):
+    first_id = auth_client.post("/goals/board/create", {"title": "first"}).data["id"]
+    assert auth_client.get(f"/goals/board/{first_id}").status_code == status.HTTP_200_OK
+    board_id = auth_client.post("/goals/board/create", {"title": "new"}).data["id"]
+
+    response = auth_client.post("/goals/goal_category/create", {"title": "new", "board": board_id})
+    assert response.status_code == status.HTTP_201_CREATED
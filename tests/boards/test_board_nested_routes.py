@@ -0,0 +1,59 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from tests.factories import BoardParticipantFactory, CategoryFactory, CommentFactory, GoalFactory
+from tests.utils import count_queries
+
+
+@pytest.fixture
+def other_board(user):
+    participant = BoardParticipantFactory(user=user)
+    goal = GoalFactory(category=CategoryFactory(board=participant.board, user=user), user=user)
+    CommentFactory(goal=goal, user=user)
+    return participant.board
+
+
+@pytest.fixture
+def content(board, goal_category, board_participant, user, other_board):
+    goals = GoalFactory.create_batch(2, category=goal_category, user=user)
+    CommentFactory(goal=goals[0], user=user)
+    return goals
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('section, expected', [('categories', 1), ('goals', 2), ('comments', 1)])
+def test_nested_lists_are_scoped(auth_client, board, content, section, expected):
+    response = auth_client.get(f'/goals/board/{board.id}/{section}')
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('section', ['categories', 'goals', 'comments'])
+def test_nested_lists_skip_participant_join(auth_client, board, content, user, section):
+    url = f'/goals/board/{board.id}/{section}'
+    auth_client.get(url)
+    _, before = count_queries(auth_client, url)
+    for _ in range(10):
+        BoardParticipantFactory(user=user)
+    auth_client.get(url)
+
+    with CaptureQueriesContext(connection) as context:
+        auth_client.get(url)
+    assert len(context.captured_queries) == before
+    assert not any('goals_boardparticipant' in query['sql'] for query in context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_nested_lists_of_foreign_board(auth_client, content):
+    foreign = GoalFactory().category.board
+    for section in ('categories', 'goals', 'comments'):
+        assert auth_client.get(f'/goals/board/{foreign.id}/{section}').status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_category_list_filters_by_board(auth_client, board, content, other_board):
+    data = auth_client.get('/goals/goal_category/list', {'board': other_board.id}).json()
+    assert [item['board'] for item in data] == [other_board.id]
@@ -1,7 +1,9 @@
 import pytest
+from django.db.models import prefetch_related_objects
 from rest_framework import status
 
 from goals.serializers import BoardSerializer
+from goals.views import participants_prefetch
 
 
 @pytest.mark.django_db
@@ -10,6 +12,7 @@ def test_retrieve_board(auth_client, board, board_participant):
     response = auth_client.get(f"/goals/board/{board.pk}")
 
     assert response.status_code == status.HTTP_200_OK
+    prefetch_related_objects([board], participants_prefetch())
     assert response.json() == BoardSerializer(board).data
 
 
@@ -0,0 +1,64 @@
+import pytest
+from rest_framework import status
+
+from goals.models import BoardParticipant
+from tests.factories import BoardParticipantFactory, CategoryFactory, CommentFactory, GoalFactory
+from tests.utils import assert_fixed_queries
+
+
+def url(board):
+    return f'/goals/board/{board.id}/snapshot'
+
+
+@pytest.fixture
+def content(board, goal_category, board_participant, user):
+    goals = GoalFactory.create_batch(3, category=goal_category, user=user)
+    CommentFactory.create_batch(2, goal=goals[0], user=user)
+    CategoryFactory(board=board, user=user, is_deleted=True)
+    return goals
+
+
+@pytest.mark.django_db
+def test_snapshot(auth_client, board, goal_category, content):
+    response = auth_client.get(url(board))
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+
+    assert data['board']['id'] == board.id
+    assert data['role'] == BoardParticipant.Role.owner
+    assert [item['id'] for item in data['categories']['results']] == [goal_category.id]
+    assert {item['id']: item['comment_count'] for item in data['goals']['results']} == {
+        content[0].id: 2, content[1].id: 0, content[2].id: 0,
+    }
+    assert len(data['participants']['results']) == 1
+    assert not data['goals']['has_more']
+
+
+@pytest.mark.django_db
+def test_snapshot_is_capped(auth_client, board, content):
+    data = auth_client.get(url(board), {'limit': 2}).json()
+    assert len(data['goals']['results']) == 2
+    assert data['goals']['has_more']
+    assert not data['categories']['has_more']
+
+
+@pytest.mark.django_db
+def test_snapshot_fixed_queries(auth_client, board, goal_category, content, user):
+    def grow():
+        category = CategoryFactory(board=board, user=user)
+        for goal in GoalFactory.create_batch(5, category=category, user=user):
+            CommentFactory.create_batch(2, goal=goal, user=user)
+        BoardParticipantFactory.create_batch(3, board=board, role=BoardParticipant.Role.reader)
+
+    # сессия, пользователь, доска и по запросу на участников, категории и цели
+    assert_fixed_queries(auth_client, url(board), 6, grow)
+
+
+@pytest.mark.django_db
+def test_snapshot_of_foreign_or_deleted_board(auth_client, board, board_participant, content):
+    foreign = BoardParticipantFactory().board
+    assert auth_client.get(url(foreign)).status_code == status.HTTP_404_NOT_FOUND
+
+    board.is_deleted = True
+    board.save()
+    assert auth_client.get(url(board)).status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,97 @@
+import datetime
+import json
+
+import pytest
+from django.core.management import call_command
+from rest_framework import status
+
+from goals.counters import find_drift
+from goals.models import Goal, GoalCounter
+from tests.factories import CategoryFactory, GoalFactory
+
+
+def summary(client, board):
+    response = client.get(f'/goals/board/{board.id}/summary')
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+@pytest.fixture
+def goals(board, goal_category, board_participant, user):
+    yesterday = datetime.date.today() - datetime.timedelta(days=1)
+    return [
+        GoalFactory(category=goal_category, user=user, priority=Goal.Priority.high, due_date=yesterday),
+        GoalFactory(category=goal_category, user=user, status=Goal.Status.done, due_date=yesterday),
+        GoalFactory(category=goal_category, user=user),
+    ]
+
+
+@pytest.mark.django_db
+def test_summary(auth_client, board, goal_category, goals, user):
+    CategoryFactory(board=board, user=user, title='пустая')
+    data = summary(auth_client, board)
+
+    assert data['board']['total'] == 3
+    assert data['board']['overdue'] == 1
+    assert data['board']['status'] == {'1': 2, '2': 0, '3': 1, '4': 0}
+    assert data['board']['priority'] == {'1': 0, '2': 2, '3': 1, '4': 0}
+    assert [(item['id'], item['total']) for item in data['categories']] == [(goal_category.id, 3)] + [
+        (item['id'], 0) for item in data['categories'][1:]
+    ]
+
+
+@pytest.mark.django_db
+def test_counters_follow_goal_writes(auth_client, board, goal_category, goals):
+    auth_client.post('/goals/goal/create', {'title': 'new', 'category': goal_category.id})
+    auth_client.patch(f'/goals/goal/{goals[0].id}', json.dumps({'status': Goal.Status.done}),
+                      content_type='application/json')
+    auth_client.delete(f'/goals/goal/{goals[2].id}')
+    auth_client.patch('/goals/goal/bulk_update', json.dumps({'ids': [goals[1].id], 'priority': 4}),
+                      content_type='application/json')
+    auth_client.post('/goals/goal/bulk_create', json.dumps({'goals': [{'title': 'b', 'category': goal_category.id}]}),
+                     content_type='application/json')
+
+    assert find_drift(board.id) == {}
+    data = summary(auth_client, board)
+    assert data['board']['status'] == {'1': 2, '2': 0, '3': 2, '4': 1}
+    assert data['board']['overdue'] == 0
+
+
+@pytest.mark.django_db
+def test_counters_follow_archive(auth_client, board, goal_category, goals, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        auth_client.delete(f'/goals/goal_category/{goal_category.id}')
+
+    assert find_drift(board.id) == {}
+    assert set(GoalCounter.objects.filter(count__gt=0).values_list('status', flat=True)) == {Goal.Status.archived}
+    assert summary(auth_client, board)['categories'] == []
+
+
+@pytest.mark.django_db
+def test_verify_and_repair(board, goals, capsys):
+    Goal.objects.filter(id=goals[0].id).update(status=Goal.Status.in_progress)
+    assert find_drift(board.id)
+
+    call_command('verify_goal_counters')
+    assert 'Расхождений найдено: 2' in capsys.readouterr().out
+    call_command('verify_goal_counters', '--repair')
+    assert find_drift(board.id) == {}
+    assert not GoalCounter.objects.filter(count=0).exists()
+
+
+@pytest.mark.django_db
+def test_summary_of_foreign_board(auth_client, goals):
+    foreign = GoalFactory().board
+    assert auth_client.get(f'/goals/board/{foreign.id}/summary').status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_stale_goal_save_keeps_counters(board, goals, auth_client):
+    stale = Goal.objects.get(id=goals[0].id)
+    auth_client.patch('/goals/goal/bulk_update', json.dumps({'ids': [stale.id], 'status': Goal.Status.done}),
+                      content_type='application/json')
+
+    stale.status = Goal.Status.in_progress
+    stale.save()
+
+    assert find_drift(board.id) == {}
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+from rest_framework import status
+
+from goals.models import BoardParticipant
+from tests.factories import UserFactory, BoardParticipantFactory
+from tests.utils import count_queries
+
+R = BoardParticipant.Role
+
+
+def share(client, board, participants):
+    return count_queries(
+        client,
+        f"/goals/board/{board.pk}",
+        json.dumps({"title": "shared", "participants": participants}),
+        method="put",
+        content_type="application/json",
+    )
+
+
+def roles(board):
+    return dict(board.participants.values_list("user__username", "role"))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("count", [3, 30])
+def test_share_query_count(auth_client, board, board_participant, count):
+    users = UserFactory.create_batch(count)
+    participants = [{"user": user.username, "role": R.writer} for user in users]
+
+    response, queries = share(auth_client, board, participants)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["participants"]) == count + 1
+    # сессия, пользователь, доска, участники, роли, поиск пользователей, savepoint, обновление доски,
+    # новая версия доски, старые участники, вставка, release savepoint, участники в ответе
+    assert queries == 13
+
+
+@pytest.mark.django_db
+def test_diff(auth_client, user, board, board_participant):
+    kept, changed, removed, added = UserFactory.create_batch(4)
+    BoardParticipantFactory(board=board, user=kept, role=R.writer)
+    BoardParticipantFactory(board=board, user=changed, role=R.writer)
+    BoardParticipantFactory(board=board, user=removed, role=R.reader)
+
+    response, _ = share(auth_client, board, [
+        {"user": kept.username, "role": R.writer},
+        {"user": changed.username, "role": R.reader},
+        {"user": added.username, "role": R.reader},
+        {"user": user.username, "role": R.writer},
+    ])
+
+    assert response.status_code == status.HTTP_200_OK
+    assert roles(board) == {
+        user.username: R.owner,
+        kept.username: R.writer,
+        changed.username: R.reader,
+        added.username: R.reader,
+    }
+    assert board.participants.get(user=added).created is not None
+
+
+@pytest.mark.django_db
+def test_unknown_user(auth_client, user, board, board_participant):
+    response, _ = share(auth_client, board, [{"user": "nobody", "role": R.writer}])
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert roles(board) == {user.username: R.owner}
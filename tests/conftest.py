@@ -1,7 +1,9 @@
 import pytest
+from django.core.cache import cache
 from pytest_factoryboy import register
 
-from tests.factories import UserFactory, BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+from tests.factories import UserFactory, BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, \
+    CommentFactory
 
 
 register(UserFactory)
@@ -9,9 +11,25 @@ register(BoardFactory)
 register(BoardParticipantFactory)
 register(CategoryFactory)
 register(GoalFactory)
+register(CommentFactory)
 
 @pytest.fixture
 @pytest.mark.django_db
 def auth_client(client, user):
     client.force_login(user)
     return client
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def no_response_cache(settings):
+    """
+    Выключает кэш ответов списков для тестов, считающих запросы к базе
+    """
+    settings.GOALS_RESPONSE_CACHE_TIMEOUT = 0
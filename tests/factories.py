@@ -1,6 +1,6 @@
 import factory.django
 
-from goals.models import Board, GoalCategory, Goal, BoardParticipant
+from goals.models import Board, GoalCategory, Goal, BoardParticipant, GoalComment
 from core.models import User
 
 
@@ -27,6 +27,7 @@ class BoardParticipantFactory(factory.django.DjangoModelFactory):
 
     board = factory.SubFactory(BoardFactory)
     user = factory.SubFactory(UserFactory)
+    role = BoardParticipant.Role.owner
 
 
 class CategoryFactory(factory.django.DjangoModelFactory):
@@ -45,3 +46,12 @@ class GoalFactory(factory.django.DjangoModelFactory):
     category = factory.SubFactory(CategoryFactory)
     user = factory.SubFactory(UserFactory)
     title = factory.Faker("word")
+
+
+class CommentFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = GoalComment
+
+    goal = factory.SubFactory(GoalFactory)
+    user = factory.SubFactory(UserFactory)
+    text = factory.Faker("sentence")
@@ -0,0 +1,83 @@
+import pytest
+from django.test import override_settings
+from rest_framework import status
+
+from goals.models import Goal
+from tests.factories import GoalFactory, CategoryFactory, BoardParticipantFactory, UserFactory
+from tests.utils import count_queries
+
+URL = '/goals/autocomplete'
+
+# сессия и пользователь
+AUTH = 2
+
+
+def titles(client, query, **params):
+    response = client.get(URL, {'q': query, **params})
+    assert response.status_code == status.HTTP_200_OK, response.content
+    data = response.json()
+    return [item['title'] for item in data['categories']], [item['title'] for item in data['goals']]
+
+
+@pytest.mark.django_db
+def test_prefix_before_similar(auth_client, board, board_participant):
+    category = CategoryFactory(board=board, title='Отпуск')
+    CategoryFactory(board=board, title='Работа')
+    GoalFactory(category=category, title='Купить билеты в отпуск')
+    GoalFactory(category=category, title='Отпускные')
+
+    assert titles(auth_client, 'отп') == (['Отпуск'], ['Отпускные', 'Купить билеты в отпуск'])
+
+
+@pytest.mark.django_db
+def test_typo(auth_client, board, board_participant):
+    CategoryFactory(board=board, title='Отпуск')
+    assert titles(auth_client, 'отпск')[0] == ['Отпуск']
+    assert titles(auth_client, 'ремонт')[0] == []
+
+
+@pytest.mark.django_db
+def test_visibility(auth_client, board, board_participant):
+    other = BoardParticipantFactory(user=UserFactory())
+    CategoryFactory(board=other.board, title='Отпуск чужой')
+    CategoryFactory(board=board, title='Отпуск удаленный', is_deleted=True)
+    category = CategoryFactory(board=board, title='Отпуск')
+    GoalFactory(category=category, title='Отпуск архив', status=Goal.Status.archived)
+
+    assert titles(auth_client, 'отпуск') == (['Отпуск'], [])
+    assert auth_client.get(URL, {'q': 'отпуск', 'board': other.board_id}).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_limit(auth_client, board, board_participant):
+    CategoryFactory.create_batch(5, board=board, title='Отпуск')
+    assert len(titles(auth_client, 'отп', limit=2)[0]) == 2
+    assert len(titles(auth_client, 'отп', limit=100)[0]) == 5
+    with override_settings(GOALS_AUTOCOMPLETE_LIMIT=3):
+        assert len(titles(auth_client, 'отп', limit='abc')[0]) == 3
+        assert len(titles(auth_client, 'отп', limit=0)[0]) == 3
+
+
+@pytest.mark.django_db
+def test_cached_until_board_changes(auth_client, board, board_participant):
+    CategoryFactory(board=board, title='Отпуск')
+    titles(auth_client, 'отп')
+
+    _, queries = count_queries(auth_client, URL, {'q': 'отп'})
+    assert queries == AUTH
+
+    CategoryFactory(board=board, title='Отпускные')
+    assert titles(auth_client, 'отп')[0] == ['Отпуск', 'Отпускные']
+
+
+@pytest.mark.django_db
+@override_settings(GOALS_AUTOCOMPLETE_BUDGET_MS=0)
+def test_budget_exceeded(auth_client, board, board_participant):
+    CategoryFactory(board=board, title='Отпуск')
+    data = auth_client.get(URL, {'q': 'отп'}).json()
+    assert data == {'partial': True, 'categories': [], 'goals': []}
+
+
+@pytest.mark.django_db
+def test_query_required(auth_client, board_participant):
+    assert auth_client.get(URL, {'q': ' '}).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from rest_framework import status
+
+from tests.factories import GoalFactory
+from tests.utils import count_queries
+
+# сессия и пользователь
+AUTH = 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url, expected', [
+    ('/goals/goal/{goal.pk}', AUTH + 1),
+    ('/goals/goal_category/{goal.category_id}', AUTH + 1),
+    ('/goals/board/{goal.board_id}', AUTH + 2),
+], ids=['goal', 'category', 'board'])
+def test_detail_not_modified(auth_client, goal, board_participant, url, expected):
+    url = url.format(goal=goal)
+    response = auth_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Last-Modified']
+
+    response, queries = count_queries(auth_client, url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b''
+    assert response['ETag']
+    assert queries == expected
+
+
+@pytest.mark.django_db
+def test_detail_etag_changes_on_update(auth_client, goal, board_participant):
+    etag = auth_client.get(f'/goals/goal/{goal.pk}')['ETag']
+    auth_client.patch(f'/goals/goal/{goal.pk}', json.dumps({'title': 'new'}), content_type='application/json')
+
+    response = auth_client.get(f'/goals/goal/{goal.pk}', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+    assert response.json()['title'] == 'new'
+
+
+@pytest.mark.django_db
+def test_detail_if_modified_since(auth_client, goal, board_participant):
+    last_modified = auth_client.get(f'/goals/goal/{goal.pk}')['Last-Modified']
+    response = auth_client.get(f'/goals/goal/{goal.pk}', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', ['/goals/goal/list', '/goals/goal_category/list', '/goals/board/list'])
+def test_list_not_modified(auth_client, goal, board_participant, url):
+    etag = auth_client.get(url)['ETag']
+
+    # агрегат считается до кэша ответов и до сериализатора
+    response, queries = count_queries(auth_client, url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert queries == AUTH + 1
+
+
+@pytest.mark.django_db
+def test_list_etag_changes(auth_client, goal, goal_category, board_participant):
+    etag = auth_client.get('/goals/goal/list')['ETag']
+    assert auth_client.get('/goals/goal/list', {'limit': 1})['ETag'] != etag
+
+    GoalFactory(category=goal_category)
+    response = auth_client.get('/goals/goal/list', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 2
+
+
+@pytest.mark.django_db
+def test_list_ignores_if_modified_since(auth_client, goal, goal_comment, board_participant):
+    url = '/goals/goal_comment/list'
+    response = auth_client.get(url, {'goal': goal.pk})
+    assert 'Last-Modified' not in response
+    etag = response['ETag']
+
+    auth_client.delete(f'/goals/goal_comment/{goal_comment.pk}')
+    response = auth_client.get(url, {'goal': goal.pk}, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    assert auth_client.get(url, {'goal': goal.pk}, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
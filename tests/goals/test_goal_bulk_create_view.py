@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from rest_framework import status
+
+from goals.models import Goal, BoardParticipant
+from tests.factories import CategoryFactory, BoardParticipantFactory
+from tests.utils import count_queries
+
+URL = '/goals/goal/bulk_create'
+
+
+def post(client, data):
+    return count_queries(client, URL, json.dumps(data), method="post", content_type="application/json")
+
+
+@pytest.fixture
+def other_category(user):
+    category = CategoryFactory()
+    BoardParticipantFactory(board=category.board, user=user, role=BoardParticipant.Role.writer)
+    return category
+
+
+@pytest.mark.django_db
+def test_success(auth_client, goal_category, other_category, board_participant):
+    goals = [{"title": f"goal {i}", "category": category.pk}
+             for i in range(40) for category in (goal_category, other_category)]
+
+    response, queries = post(auth_client, {"goals": goals})
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(response.data["created"]) == 80
+    assert response.data["errors"] == []
+    assert Goal.objects.count() == 80
+    assert Goal.objects.filter(created__isnull=True).count() == 0
+    # сессия, пользователь, категории, роли, вставка (SQLite делит вставку по 999 параметров)
+    # и по новому счетчику на категорию (обновление, затем вставка), всё в точке сохранения
+    assert queries == 15
+
+
+@pytest.mark.django_db
+def test_invalid_item_aborts(auth_client, goal_category, board_participant):
+    goals = [
+        {"title": "ok", "category": goal_category.pk},
+        {"title": "no category", "category": 0},
+        {"category": goal_category.pk},
+    ]
+    response, _ = post(auth_client, {"goals": goals})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    errors = response.json()["goals"]
+    assert errors[0] == {}
+    assert set(errors[1]) == {"category"}
+    assert set(errors[2]) == {"title"}
+    assert Goal.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_skip_invalid(auth_client, goal_category, board_participant):
+    reader_category = CategoryFactory()
+    BoardParticipantFactory(board=reader_category.board, user=board_participant.user,
+                            role=BoardParticipant.Role.reader)
+    goals = [
+        {"title": "ok", "category": goal_category.pk},
+        {"title": "reader", "category": reader_category.pk},
+    ]
+    response, _ = post(auth_client, {"goals": goals, "skip_invalid": True})
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [goal["title"] for goal in response.data["created"]] == ["ok"]
+    assert response.data["errors"] == [{}, {"category": ["Вы должны быть владельцем или редактором доски для этого"]}]
+    assert Goal.objects.count() == 1
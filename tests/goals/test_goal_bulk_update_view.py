@@ -0,0 +1,95 @@
+import datetime
+import json
+
+import pytest
+from rest_framework import status
+
+from goals.models import Goal, BoardParticipant
+from tests.factories import GoalFactory, CategoryFactory, BoardParticipantFactory
+from tests.utils import count_queries
+
+
+def patch(client, url, data):
+    return count_queries(client, url, json.dumps(data), method="patch", content_type="application/json")
+
+
+@pytest.mark.django_db
+def test_update_by_ids(auth_client, goal_category, board_participant):
+    goals = GoalFactory.create_batch(3, category=goal_category)
+    untouched = GoalFactory(category=goal_category)
+
+    response, queries = patch(auth_client, "/goals/goal/bulk_update", {
+        "ids": [goal.id for goal in goals],
+        "priority": Goal.Priority.critical,
+    })
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"updated": 3}
+    assert set(Goal.objects.filter(priority=Goal.Priority.critical).values_list("id", flat=True)) == {
+        goal.id for goal in goals
+    }
+    assert Goal.objects.get(id=untouched.id).updated == untouched.updated
+    assert all(Goal.objects.get(id=goal.id).updated > goal.updated for goal in goals)
+    # сессия, пользователь, блокировка целей, ключи счетчиков, обновление, старый счетчик
+    # и новый счетчик (обновление, затем вставка), всё в точке сохранения
+    assert queries == 12
+
+
+@pytest.mark.django_db
+def test_archive_by_filter(auth_client, board, goal_category, board_participant):
+    old = datetime.date(2022, 1, 1)
+    new = datetime.date(2022, 3, 1)
+    archived = GoalFactory(category=goal_category, status=Goal.Status.done, due_date=old)
+    GoalFactory(category=goal_category, status=Goal.Status.done, due_date=new)
+    GoalFactory(category=goal_category, status=Goal.Status.to_do, due_date=old)
+    GoalFactory(status=Goal.Status.done, due_date=old)
+
+    response, _ = patch(
+        auth_client,
+        f"/goals/goal/bulk_archive?board={board.pk}&status={Goal.Status.done}&due_date__lte=2022-02-01",
+        {},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"updated": 1}
+    assert list(Goal.objects.filter(status=Goal.Status.archived).values_list("id", flat=True)) == [archived.id]
+
+
+@pytest.mark.django_db
+def test_reader_goals_are_not_updated(auth_client, user, goal_category, board_participant):
+    reader_category = CategoryFactory()
+    BoardParticipantFactory(board=reader_category.board, user=user, role=BoardParticipant.Role.reader)
+    goals = [GoalFactory(category=goal_category), GoalFactory(category=reader_category)]
+
+    response, _ = patch(auth_client, "/goals/goal/bulk_archive", {"ids": [goal.id for goal in goals]})
+
+    assert response.data == {"updated": 1}
+    assert Goal.objects.get(id=goals[1].id).status == Goal.Status.to_do
+
+
+@pytest.mark.django_db
+def test_no_selection(auth_client, goal, board_participant):
+    response, _ = patch(auth_client, "/goals/goal/bulk_archive", {})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response, _ = patch(auth_client, "/goals/goal/bulk_update", {"ids": [goal.id]})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Goal.objects.get(id=goal.id).status == Goal.Status.to_do
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url, data", [
+    ("/goals/goal/bulk_update?status=", {"priority": Goal.Priority.critical}),
+    ("/goals/goal/bulk_archive?category=", {}),
+], ids=["update", "archive"])
+def test_blank_filters_select_nothing(auth_client, goal, board_participant, url, data):
+    response, _ = patch(auth_client, url, data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Goal.objects.filter(id=goal.id, status=goal.status, priority=goal.priority).exists()
+
+
+@pytest.mark.django_db
+def test_invalid_filter(auth_client, goal, board_participant):
+    response, _ = patch(auth_client, "/goals/goal/bulk_archive?status=abc", {})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Goal.objects.get(id=goal.id).status == Goal.Status.to_do
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+
+import pytest
+from rest_framework import status
+
+from tests.factories import GoalFactory, CommentFactory
+
+URL = '/goals/goal/export'
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.fixture
+def goals(goal_category, board_participant, user):
+    goals = [GoalFactory(category=goal_category, user=user) for _ in range(3)]
+    for goal in goals[:2]:
+        CommentFactory.create_batch(2, goal=goal, user=user)
+    return goals
+
+
+@pytest.mark.django_db
+def test_export_ndjson(auth_client, goals, board):
+    response = auth_client.get(URL)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'application/x-ndjson'
+
+    rows = [json.loads(line) for line in content(response).splitlines()]
+    assert [row['id'] for row in rows] == [goal.id for goal in goals]
+    assert rows[0]['board'] == board.id
+    assert [len(row['comments']) for row in rows] == [2, 2, 0]
+    assert rows[0]['comments'][0]['text'] == goals[0].goal_comments.order_by('id').first().text
+
+
+@pytest.mark.django_db
+def test_export_csv(auth_client, goals):
+    response = auth_client.get(URL, {'output': 'csv'})
+    assert response.status_code == status.HTTP_200_OK
+
+    rows = list(csv.DictReader(io.StringIO(content(response))))
+    assert [int(row['id']) for row in rows] == [goal.id for goal in goals]
+    assert len(json.loads(rows[0]['comments'])) == 2
+
+
+@pytest.mark.django_db
+def test_export_respects_visibility(auth_client, goals):
+    foreign = GoalFactory()
+    CommentFactory(goal=foreign)
+
+    ids = [json.loads(line)['id'] for line in content(auth_client.get(URL)).splitlines()]
+    assert foreign.id not in ids
+    assert content(auth_client.get(URL, {'board': foreign.category.board_id})) == ''
+
+
+@pytest.mark.django_db
+def test_export_unknown_format(auth_client, goals):
+    response = auth_client.get(URL, {'output': 'xml'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_export_invalid_board(auth_client, goals):
+    response = auth_client.get(URL, {'board': 'abc'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
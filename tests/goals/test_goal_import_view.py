@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+
+from goals import importer
+from goals.importer import GoalImporter
+from goals.models import Goal, GoalCategory, GoalComment, GoalImportJob
+from tests.factories import BoardFactory, GoalFactory, CommentFactory
+
+URL = '/goals/goal/import'
+
+
+def ndjson(rows):
+    return SimpleUploadedFile('goals.ndjson', ''.join(json.dumps(row) + '\n' for row in rows).encode())
+
+
+@pytest.mark.django_db
+def test_import_ndjson(auth_client, board, board_participant, goal_category):
+    rows = [
+        {'board': board.id, 'category_title': goal_category.title, 'title': 'первая',
+         'created': '2021-01-01T00:00:00Z', 'comments': [{'text': 'привет'}, {'text': 'пока'}]},
+        {'board': board.id, 'category_title': 'новая', 'title': 'вторая', 'priority': 4},
+        {'board': board.id, 'category_title': 'новая', 'title': 'третья', 'due_date': '2022-01-01'},
+    ]
+    response = auth_client.post(URL, {'file': ndjson(rows)})
+    assert response.status_code == status.HTTP_201_CREATED
+    report = response.json()
+    assert (report['rows'], report['goals'], report['comments'], report['errors']) == (3, 3, 2, [])
+
+    first, second, third = Goal.objects.order_by('id')
+    assert first.category == goal_category
+    assert first.created.year == 2021 and first.updated.year > 2021
+    assert second.category == third.category
+    assert second.category.title == 'новая' and second.category.board == board
+    assert GoalComment.objects.filter(goal=first).count() == 2
+
+
+@pytest.mark.django_db
+def test_import_reports_row_errors(auth_client, board, board_participant):
+    foreign = BoardFactory()
+    rows = [
+        {'board': board.id, 'category_title': 'a', 'title': 'ok'},
+        {'board': board.id, 'category_title': 'a'},
+        {'board': foreign.id, 'category_title': 'a', 'title': 'чужая'},
+    ]
+    report = auth_client.post(URL, {'file': ndjson(rows)}).json()
+    assert report['goals'] == 1
+    assert [error['row'] for error in report['errors']] == [2, 3]
+    assert 'title' in report['errors'][0]['errors']
+    assert not GoalCategory.objects.filter(board=foreign).exists()
+
+
+@pytest.mark.django_db
+def test_import_caps_reported_errors(auth_client, board, board_participant):
+    rows = [{'board': board.id, 'category_title': 'a'}] * 5
+    with override_settings(GOALS_IMPORT_MAX_ERRORS=2):
+        report = auth_client.post(URL, {'file': ndjson(rows)}).json()
+    assert [error['row'] for error in report['errors']] == [1, 2]
+    assert report['error_count'] == 5
+    assert GoalImportJob.objects.get(id=report['job']).error_count == 5
+
+
+@pytest.mark.django_db
+def test_import_csv_from_export(auth_client, board, board_participant, goal_category, user):
+    goal = GoalFactory(category=goal_category, user=user)
+    CommentFactory(goal=goal, user=user)
+    export = b''.join(auth_client.get('/goals/goal/export', {'output': 'csv'}).streaming_content)
+
+    response = auth_client.post(URL, {'file': SimpleUploadedFile('goals.csv', export)})
+    assert response.json()['errors'] == []
+    copy = Goal.objects.exclude(id=goal.id).get()
+    assert (copy.title, copy.category_id, copy.created) == (goal.title, goal.category_id, goal.created)
+    assert copy.goal_comments.count() == 1
+
+
+@pytest.mark.django_db
+def test_import_resumes(board, board_participant, user):
+    rows = [{'board': board.id, 'category_title': 'a', 'title': str(number)} for number in range(5)]
+    job = GoalImportJob(user=user, format=GoalImportJob.Format.ndjson, rows_done=2)
+    job.save()
+
+    lines = [json.dumps(row) + '\n' for row in rows]
+    report = GoalImporter(job, batch_size=2).run(iter(lines))
+    assert report['is_done'] and report['rows'] == 3
+    assert list(Goal.objects.order_by('id').values_list('title', flat=True)) == ['2', '3', '4']
+    job.refresh_from_db()
+    assert (job.rows_done, job.goals_created) == (5, 3)
+
+
+@pytest.mark.django_db
+def test_import_stamps_rows_before_commit(board, board_participant, user, monkeypatch):
+    written = []
+    apply = importer.GoalCounter.apply
+
+    def recording_apply(deltas):
+        apply(deltas)
+        written.append(timezone.now())
+
+    monkeypatch.setattr(importer.GoalCounter, 'apply', recording_apply)
+    row = {'board': board.id, 'category_title': 'a', 'title': 'b', 'comments': [{'text': 'c'}]}
+    job = GoalImportJob(user=user, format=GoalImportJob.Format.ndjson)
+    job.save()
+    GoalImporter(job).run(iter([json.dumps(row) + '\n']))
+
+    for model in (GoalCategory, Goal, GoalComment):
+        assert model.objects.get().updated > written[0]
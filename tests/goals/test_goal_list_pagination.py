@@ -0,0 +1,98 @@
+import datetime
+
+import pytest
+from rest_framework import status
+
+from tests.factories import GoalFactory, CommentFactory
+
+URL = '/goals/goal/list'
+
+
+def walk(client, url):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        ids += [item['id'] for item in data['results']]
+        url = data['next']
+    return ids
+
+
+@pytest.fixture
+def goals(goal_category, board_participant, user):
+    due_dates = [None, datetime.date(2022, 1, 1), datetime.date(2022, 2, 1)]
+    return [
+        GoalFactory(category=goal_category, user=user, priority=priority, due_date=due_date)
+        for priority in (1, 2, 3)
+        for due_date in due_dates
+        for _ in range(2)
+    ]
+
+
+@pytest.mark.django_db
+def test_limit_offset_is_default(auth_client, goals):
+    response = auth_client.get(URL, {'limit': 5, 'offset': 5})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data['count'] == len(goals)
+    assert len(data['results']) == 5
+
+
+@pytest.mark.django_db
+def test_cursor_walks_all_goals_in_order(auth_client, goals):
+    expected = sorted(
+        goals,
+        key=lambda goal: (goal.priority, goal.due_date is None, goal.due_date or datetime.date.min, goal.id),
+    )
+    ids = walk(auth_client, f'{URL}?pagination=cursor&limit=4')
+    assert ids == [goal.id for goal in expected]
+
+
+@pytest.mark.django_db
+def test_cursor_follows_ordering_param(auth_client, goals):
+    expected = sorted(
+        goals,
+        key=lambda goal: (goal.due_date is None, -(goal.due_date or datetime.date.min).toordinal(), goal.id),
+    )
+    ids = walk(auth_client, f'{URL}?pagination=cursor&limit=4&ordering=-due_date')
+    assert ids == [goal.id for goal in expected]
+
+    first = auth_client.get(URL, {'pagination': 'cursor', 'limit': 4}).json()
+    response = auth_client.get(first['next'] + '&ordering=-due_date')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_cursor_is_stable_on_insert(auth_client, goals, goal_category, user):
+    first = auth_client.get(URL, {'pagination': 'cursor', 'limit': 9}).json()
+    GoalFactory(category=goal_category, user=user, priority=1)
+
+    rest = walk(auth_client, first['next'])
+    seen = [item['id'] for item in first['results']] + rest
+    assert len(seen) == len(set(seen))
+    assert set(seen) == {goal.id for goal in goals}
+
+
+@pytest.mark.django_db
+def test_cursor_previous_page(auth_client, goals):
+    first = auth_client.get(URL, {'pagination': 'cursor', 'limit': 4}).json()
+    second = auth_client.get(first['next']).json()
+    assert first['previous'] is None
+
+    back = auth_client.get(second['previous']).json()
+    assert [item['id'] for item in back['results']] == [item['id'] for item in first['results']]
+
+
+@pytest.mark.django_db
+def test_tampered_cursor(auth_client, goals):
+    first = auth_client.get(URL, {'pagination': 'cursor', 'limit': 4}).json()
+    response = auth_client.get(first['next'].replace('cursor=', 'cursor=x'))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_comment_cursor(auth_client, goal, board_participant, user):
+    comments = [CommentFactory(goal=goal, user=user) for _ in range(5)]
+    ids = walk(auth_client, f'/goals/goal_comment/list?goal={goal.id}&pagination=cursor&limit=2')
+    assert ids == sorted((comment.id for comment in comments), reverse=True)
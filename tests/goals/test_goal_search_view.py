@@ -0,0 +1,108 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from goals.models import GoalComment
+from goals.search import reinstall_sqlite_triggers
+from tests.factories import GoalFactory, CommentFactory, CategoryFactory, BoardParticipantFactory, UserFactory
+
+URL = '/goals/goal/search'
+
+
+def found(client, query, **params):
+    response = client.get(URL, {'q': query, **params})
+    assert response.status_code == status.HTTP_200_OK, response.content
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_ranked_by_field(auth_client, goal_category, board_participant):
+    in_comment = GoalFactory(category=goal_category, title='купить', description='молоко')
+    CommentFactory(goal=in_comment, text='не забыть про отпуск')
+    in_title = GoalFactory(category=goal_category, title='отпуск на море', description='')
+    GoalFactory(category=goal_category, title='работа', description='отчет')
+
+    assert [goal['id'] for goal in found(auth_client, 'отпуск')] == [in_title.id, in_comment.id]
+
+
+@pytest.mark.django_db
+def test_snippet_is_escaped(auth_client, goal_category, board_participant):
+    GoalFactory(category=goal_category, title='план', description='<b>отпуск</b> летом')
+
+    goal, = found(auth_client, 'отпуск')
+    assert goal['snippet'] == '&lt;b&gt;<mark>отпуск</mark>&lt;/b&gt; летом'
+    assert goal['rank'] > 0
+
+
+@pytest.mark.django_db
+def test_comment_changes_are_indexed(auth_client, goal_category, board_participant):
+    goal = GoalFactory(category=goal_category, title='план')
+    comment = CommentFactory(goal=goal, text='отпуск')
+    assert len(found(auth_client, 'отпуск')) == 1
+
+    GoalComment.objects.filter(pk=comment.pk).update(text='работа')
+    assert found(auth_client, 'отпуск') == []
+    assert len(found(auth_client, 'работа')) == 1
+
+    GoalComment.objects.filter(pk=comment.pk).delete()
+    assert found(auth_client, 'работа') == []
+
+
+@pytest.mark.django_db
+def test_visibility(auth_client, goal_category, board_participant):
+    other = BoardParticipantFactory(user=UserFactory())
+    GoalFactory(category=CategoryFactory(board=other.board, user=other.user), title='отпуск')
+    deleted = CategoryFactory(board=goal_category.board, is_deleted=True)
+    GoalFactory(category=deleted, title='отпуск')
+    visible = GoalFactory(category=goal_category, title='отпуск')
+
+    assert [goal['id'] for goal in found(auth_client, 'отпуск')] == [visible.id]
+    assert found(auth_client, 'отпуск', board=other.board_id) == []
+
+
+@pytest.mark.django_db
+def test_query_required(auth_client, board_participant):
+    assert auth_client.get(URL).status_code == status.HTTP_400_BAD_REQUEST
+    assert auth_client.get(URL, {'q': '"*'}).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_goal_list_search(auth_client, goal_category, board_participant):
+    goal = GoalFactory(category=goal_category, title='план')
+    CommentFactory(goal=goal, text='отпуск')
+    GoalFactory(category=goal_category, title='работа')
+
+    response = auth_client.get('/goals/goal/list', {'search': 'отпуск'})
+    assert [item['id'] for item in response.json()] == [goal.id]
+
+
+@pytest.mark.django_db
+def test_page_ranks_only_page(auth_client, goal_category, board_participant):
+    goals = GoalFactory.create_batch(3, category=goal_category, title='отпуск')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = auth_client.get(URL, {'q': 'отпуск', 'limit': 1})
+    data = response.json()
+    assert data['count'] == 3
+    assert [goal['id'] for goal in data['results']] == [goals[-1].id]
+    assert data['results'][0]['snippet'] == '<mark>отпуск</mark>'
+
+    count_sql, = [query['sql'] for query in queries if 'COUNT(' in query['sql']]
+    assert 'bm25' not in count_sql and 'snippet' not in count_sql
+    snippet_sql, = [query['sql'] for query in queries if 'snippet(' in query['sql']]
+    assert f'IN ({goals[-1].id})' in snippet_sql
+
+
+@pytest.mark.django_db
+def test_lost_triggers_reinstalled(auth_client, goal_category, board_participant):
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TRIGGER goals_goal_fts_insert')
+    goal = GoalFactory(category=goal_category, title='отпуск')
+    assert found(auth_client, 'отпуск') == []
+
+    assert reinstall_sqlite_triggers() == ['goals_goal_fts_insert']
+    assert reinstall_sqlite_triggers() == []
+    assert [item['id'] for item in found(auth_client, 'отпуск')] == [goal.id]
+    GoalFactory(category=goal_category, title='отпуск')
+    assert len(found(auth_client, 'отпуск')) == 2
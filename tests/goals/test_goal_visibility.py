@@ -0,0 +1,60 @@
+import pytest
+
+from goals.models import Goal, GoalComment, GoalCategory, Board, BoardParticipant
+from tests.factories import BoardParticipantFactory
+
+
+@pytest.mark.django_db
+def test_visible_without_duplicates(goal, goal_comment, board, board_participant, user):
+    BoardParticipantFactory.create_batch(3, board=board, role=BoardParticipant.Role.reader)
+
+    assert list(Goal.objects.visible_to(user)) == [goal]
+    assert list(GoalComment.objects.visible_to(user)) == [goal_comment]
+    assert list(GoalCategory.objects.visible_to(user)) == [goal.category]
+    assert list(Board.objects.visible_to(user)) == [board]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("board_participant__role, count", [
+    (BoardParticipant.Role.owner, 1),
+    (BoardParticipant.Role.writer, 1),
+    (BoardParticipant.Role.reader, 0),
+], ids=['owner', 'writer', 'reader'])
+def test_min_role(goal, board_participant, user, board_participant__role, count):
+    assert Goal.objects.visible_to(user, min_role=BoardParticipant.Role.writer).count() == count
+
+
+@pytest.mark.django_db
+def test_not_participant(goal, user_factory):
+    assert not Goal.objects.visible_to(user_factory()).exists()
+
+
+@pytest.mark.django_db
+def test_board_copied_on_save(goal, goal_comment, board, category_factory):
+    assert goal.board_id == board.id
+    assert goal_comment.board_id == board.id
+
+    goal.category = category_factory(board=board)
+    goal.save()
+    goal.refresh_from_db()
+    assert goal.board_id == board.id
+
+
+@pytest.mark.django_db
+def test_visibility_skips_category_join(user):
+    goals_sql = str(Goal.objects.visible_to(user).query)
+    comments_sql = str(GoalComment.objects.visible_to(user).query)
+    assert 'goals_goalcategory' not in goals_sql
+    assert 'goals_goal"' not in comments_sql.replace('goals_goalcomment"', '')
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("no_response_cache")
+def test_deleted_category_hidden_before_archive(auth_client, goal, goal_comment, goal_category, board_participant):
+    GoalCategory.objects.filter(pk=goal_category.pk).update(is_deleted=True)
+
+    assert auth_client.get(f"/goals/goal/{goal.pk}").status_code == 404
+    assert auth_client.get(f"/goals/goal_comment/{goal_comment.pk}").status_code == 404
+    assert auth_client.get("/goals/goal_comment/list", {"goal": goal.pk}).json() == []
+    response = auth_client.post("/goals/goal_comment/create", {"text": "new", "goal": goal.pk})
+    assert response.status_code == 400
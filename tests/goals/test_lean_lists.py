@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+from rest_framework import status
+
+from goals.models import Board
+from tests.factories import GoalFactory, CommentFactory, CategoryFactory
+
+URLS = [
+    '/goals/goal/list',
+    '/goals/goal_comment/list',
+    '/goals/goal_category/list',
+    '/goals/board/list',
+]
+
+
+@pytest.fixture
+def goals(board, goal_category, board_participant, user):
+    CategoryFactory(board=board, user=user, title='Категория   «кавычки»')
+    Board.objects.filter(id=board.id).update(title='Доска "1"')
+    goals = [
+        GoalFactory(category=goal_category, user=user, priority=priority, due_date=due_date, description=description)
+        for priority, due_date, description in [
+            (1, None, None),
+            (2, datetime.date(2022, 1, 1), 'описание'),
+            (2, datetime.date(2022, 1, 1), ''),
+        ]
+    ]
+    for goal in goals:
+        CommentFactory(goal=goal, user=user)
+    return goals
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', URLS)
+def test_lean_output_is_identical(auth_client, goals, url):
+    regular = auth_client.get(url)
+    lean = auth_client.get(url, {'lean': 1})
+    assert regular.status_code == lean.status_code == status.HTTP_200_OK
+    assert lean.content == regular.content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', URLS)
+def test_lean_paginated_output_is_identical(auth_client, goals, url):
+    regular = auth_client.get(url, {'limit': 2, 'offset': 1})
+    lean = auth_client.get(url, {'limit': 2, 'offset': 1, 'lean': 1})
+    assert lean.content.replace(b'lean=1&', b'') == regular.content
+
+
+@pytest.mark.django_db
+def test_lean_cursor_walks_same_goals(auth_client, goals):
+    ids, url = [], '/goals/goal/list?pagination=cursor&limit=2&lean=1'
+    while url:
+        data = auth_client.get(url).json()
+        ids += [item['id'] for item in data['results']]
+        url = data['next']
+    regular = auth_client.get('/goals/goal/list').json()
+    assert ids == [item['id'] for item in regular]
+
+
+@pytest.mark.django_db
+def test_lean_respects_filters(auth_client, goals):
+    lean = auth_client.get('/goals/goal/list', {'lean': 1, 'priority': 2, 'search': 'описание'}).json()
+    assert [item['id'] for item in lean] == [goals[1].id]
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from goals.models import BoardParticipant, Goal, GoalCategory
+from tests.factories import UserFactory
+
+
+def patch(client, url, data, **extra):
+    return client.patch(url, json.dumps(data), content_type='application/json', **extra)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', ['/goals/goal/{goal.pk}', '/goals/goal_category/{goal.category_id}'],
+                         ids=['goal', 'category'])
+def test_if_match(auth_client, goal, board_participant, url):
+    url = url.format(goal=goal)
+    etag = auth_client.get(url)['ETag']
+
+    response = patch(auth_client, url, {'title': 'first'}, HTTP_IF_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['version'] == 2
+    assert response['ETag'] != etag
+    assert auth_client.get(url)['ETag'] == response['ETag']
+
+    response = patch(auth_client, url, {'title': 'second'}, HTTP_IF_MATCH=etag)
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert auth_client.get(url).json()['title'] == 'first'
+
+
+@pytest.mark.django_db
+def test_body_version(auth_client, goal, board_participant):
+    url = f'/goals/goal/{goal.pk}'
+    assert patch(auth_client, url, {'title': 'first', 'version': 1}).status_code == status.HTTP_200_OK
+    assert patch(auth_client, url, {'title': 'second', 'version': 1}).status_code == \
+        status.HTTP_412_PRECONDITION_FAILED
+    assert patch(auth_client, url, {'title': 'second', 'version': 'x'}).status_code == \
+        status.HTTP_400_BAD_REQUEST
+    assert patch(auth_client, url, {'title': 'second'}).json()['version'] == 3
+
+
+@pytest.mark.django_db
+def test_conditional_update(auth_client, goal, board_participant):
+    with CaptureQueriesContext(connection) as context:
+        response = patch(auth_client, f'/goals/goal/{goal.pk}', {'title': 'first', 'version': 1})
+    assert response.status_code == status.HTTP_200_OK
+    update = next(query['sql'] for query in context.captured_queries if query['sql'].startswith('UPDATE'))
+    assert '"version" = 1' in update.split('WHERE')[1]
+
+
+@pytest.mark.django_db
+def test_unconditional_save_bumps_stored_version(goal_category):
+    first, second = GoalCategory.objects.get(pk=goal_category.pk), GoalCategory.objects.get(pk=goal_category.pk)
+    second.save()
+    first.save()
+    assert first.version == 3
+    goal_category.refresh_from_db()
+    assert goal_category.version == 3
+
+
+@pytest.mark.django_db
+def test_board_conflict_keeps_participants(auth_client, board, board_participant):
+    url = f'/goals/board/{board.pk}'
+    reader = UserFactory()
+    data = {'title': 'shared', 'participants': [{'user': reader.username, 'role': BoardParticipant.Role.reader}]}
+
+    response = auth_client.put(url, json.dumps({**data, 'version': 2}), content_type='application/json')
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert board.participants.count() == 1
+
+    response = auth_client.put(url, json.dumps({**data, 'version': 1}), content_type='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    assert board.participants.count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_update_bumps_version(auth_client, goal, board_participant):
+    etag = auth_client.get(f'/goals/goal/{goal.pk}')['ETag']
+    response = patch(auth_client, '/goals/goal/bulk_update', {'ids': [goal.pk], 'status': Goal.Status.done})
+    assert response.status_code == status.HTTP_200_OK
+
+    response = patch(auth_client, f'/goals/goal/{goal.pk}', {'title': 'stale'}, HTTP_IF_MATCH=etag)
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from django.test import Client
+from rest_framework import status
+
+from goals.models import BoardParticipant
+from tests.factories import GoalFactory, CategoryFactory, BoardParticipantFactory, UserFactory
+
+URL = '/goals/goal/list'
+
+
+@pytest.mark.django_db
+def test_hit_until_board_changes(auth_client, goal_category, board_participant, user):
+    GoalFactory(category=goal_category, user=user)
+
+    first = auth_client.get(URL)
+    second = auth_client.get(URL)
+    assert (first["X-Cache"], second["X-Cache"]) == ("MISS", "HIT")
+    assert second.json() == first.json()
+
+    GoalFactory(category=goal_category, user=user)
+    response = auth_client.get(URL)
+    assert response["X-Cache"] == "MISS"
+    assert len(response.json()) == 2
+
+
+@pytest.mark.django_db
+def test_other_board_write_keeps_cache(auth_client, goal_category, board_participant, user):
+    auth_client.get(f'/goals/board/{goal_category.board_id}/goals')
+
+    other = BoardParticipantFactory(user=UserFactory())
+    GoalFactory(category=CategoryFactory(board=other.board, user=other.user), user=other.user)
+
+    response = auth_client.get(f'/goals/board/{goal_category.board_id}/goals')
+    assert response["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db
+def test_params_are_normalized(auth_client, goal_category, board_participant):
+    auth_client.get(URL, {"limit": 10, "offset": 0})
+    assert auth_client.get(f'{URL}?offset=0&limit=10')["X-Cache"] == "HIT"
+    assert auth_client.get(URL, {"limit": 5})["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db
+def test_removed_participant_misses(auth_client, board, board_participant):
+    member = BoardParticipantFactory(board=board, user=UserFactory(), role=BoardParticipant.Role.reader).user
+    member_client = Client()
+    member_client.force_login(member)
+    assert len(member_client.get('/goals/board/list').json()) == 1
+
+    response = auth_client.put(
+        f'/goals/board/{board.pk}',
+        json.dumps({"title": board.title, "participants": []}),
+        content_type="application/json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    response = member_client.get('/goals/board/list')
+    assert response["X-Cache"] == "MISS"
+    assert response.json() == []
+
+
+@pytest.mark.django_db
+def test_foreign_board_not_found(auth_client, board_participant):
+    other = BoardParticipantFactory(user=UserFactory())
+    assert auth_client.get(f'/goals/board/{other.board_id}/goals').status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_stats(auth_client, goal_category, board_participant):
+    auth_client.get(URL)
+    auth_client.get(URL)
+    assert auth_client.get('/goals/cache/stats').status_code == status.HTTP_403_FORBIDDEN
+
+    admin_client = Client()
+    admin_client.force_login(UserFactory(is_staff=True))
+    response = admin_client.get('/goals/cache/stats')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["GoalListView"] == {"hits": 1, "misses": 1}
@@ -0,0 +1,12 @@
+from django.test import override_settings
+
+from goals.checks import check_shared_cache
+
+
+def test_local_cache_rejected():
+    assert [error.id for error in check_shared_cache(None)] == ["goals.E001"]
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": "redis://redis:6379/0"}})
+def test_shared_cache_accepted():
+    assert check_shared_cache(None) == []
@@ -0,0 +1,63 @@
+import pytest
+from rest_framework import status
+
+from tests.factories import GoalFactory, CommentFactory, UserFactory
+from tests.utils import count_queries
+
+pytestmark = pytest.mark.usefixtures("no_response_cache")
+
+URL = '/goals/goal/list'
+
+
+@pytest.fixture
+def goals(goal_category, board_participant, user):
+    authors = [user, UserFactory(), UserFactory()]
+    goals = [GoalFactory(category=goal_category, user=authors[i % 3]) for i in range(6)]
+    for goal in goals:
+        CommentFactory(goal=goal, user=goal.user)
+    return goals
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('lean', [0, 1])
+def test_sideload_users(auth_client, goals, lean):
+    full = auth_client.get(URL).json()
+    response = auth_client.get(URL, {'sideload': 'users', 'lean': lean})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+
+    assert [item['user_id'] for item in data['results']] == [item['user']['id'] for item in full]
+    assert all('user' not in item for item in data['results'])
+    assert len(data['users']) == 3
+    for item in full:
+        assert data['users'][str(item['user']['id'])] == item['user']
+
+
+@pytest.mark.django_db
+def test_sideload_lean_matches_regular(auth_client, goals):
+    regular = auth_client.get(URL, {'sideload': 'users', 'limit': 4})
+    lean = auth_client.get(URL, {'sideload': 'users', 'limit': 4, 'lean': 1})
+    assert lean.content.replace(b'lean=1&', b'') == regular.content
+    assert len(regular.json()['users']) == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('lean', [0, 1])
+def test_sideload_uses_one_user_query(auth_client, goals, lean):
+    auth_client.get(URL)
+    _, nested = count_queries(auth_client, URL)
+    _, sideloaded = count_queries(auth_client, URL, {'sideload': 'users', 'lean': lean})
+    assert sideloaded == nested + 1
+
+
+@pytest.mark.django_db
+def test_sideload_comments_and_fields(auth_client, goals):
+    data = auth_client.get('/goals/goal_comment/list', {'sideload': 'users', 'fields': 'id,user'}).json()
+    assert [set(item) for item in data['results']] == [{'id', 'user_id'}] * len(goals)
+    assert len(data['users']) == 3
+
+
+@pytest.mark.django_db
+def test_sideload_not_supported(auth_client, goals):
+    assert auth_client.get('/goals/board/list', {'sideload': 'users'}).status_code == status.HTTP_400_BAD_REQUEST
+    assert auth_client.get(URL, {'sideload': 'boards'}).status_code == status.HTTP_400_BAD_REQUEST
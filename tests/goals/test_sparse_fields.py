@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from tests.factories import GoalFactory, CommentFactory
+
+pytestmark = pytest.mark.usefixtures("no_response_cache")
+
+URL = '/goals/goal/list'
+
+
+@pytest.fixture
+def goals(goal_category, board_participant, user):
+    goals = GoalFactory.create_batch(3, category=goal_category, user=user, description='очень длинное описание')
+    for goal in goals:
+        CommentFactory(goal=goal, user=user)
+    return goals
+
+
+def goal_select(client, data):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(URL, data)
+    assert response.status_code == status.HTTP_200_OK
+    select = next(query['sql'] for query in context.captured_queries if 'FROM "goals_goal"' in query['sql']
+                  and 'COUNT' not in query['sql'])
+    return response.json(), select
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('lean', [0, 1])
+def test_fields_narrow_response_and_select(auth_client, goals, lean):
+    data, select = goal_select(auth_client, {'fields': 'id,title,status', 'lean': lean})
+    assert [set(item) for item in data] == [{'id', 'title', 'status'}] * 3
+    assert '"description"' not in select
+    assert '"core_user"' not in select
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('lean', [0, 1])
+def test_exclude(auth_client, goals, lean):
+    data, select = goal_select(auth_client, {'exclude': 'description', 'lean': lean})
+    assert 'description' not in data[0]
+    assert data[0]['user']['username'] == goals[0].user.username
+    assert '"description"' not in select
+
+
+@pytest.mark.django_db
+def test_sparse_fields_match_full_response(auth_client, goals):
+    full = auth_client.get(URL).json()
+    sparse = auth_client.get(URL, {'fields': 'id,user,due_date'}).json()
+    assert sparse == [{key: item[key] for key in ('id', 'user', 'due_date')} for item in full]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('lean', [0, 1])
+def test_sparse_cursor_pagination(auth_client, goals, lean):
+    ids, url = [], f'{URL}?pagination=cursor&limit=2&fields=title&lean={lean}'
+    auth_client.get(url)
+    while url:
+        with CaptureQueriesContext(connection) as context:
+            data = auth_client.get(url).json()
+        assert len(context.captured_queries) <= 4
+        ids += [item['title'] for item in data['results']]
+        url = data['next']
+    assert len(ids) == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', ['/goals/goal_comment/list', '/goals/goal_category/list', '/goals/board/list'])
+def test_other_lists(auth_client, goals, url):
+    data = auth_client.get(url, {'fields': 'id,created'}).json()
+    assert data and all(set(item) == {'id', 'created'} for item in data)
+
+
+@pytest.mark.django_db
+def test_unknown_field(auth_client, goals):
+    response = auth_client.get(URL, {'fields': 'id,password'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'password' in response.json()['fields'][0]
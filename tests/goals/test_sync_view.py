@@ -0,0 +1,149 @@
+import json
+
+import pytest
+from django.test import Client, override_settings
+from rest_framework import status
+
+from goals.models import BoardParticipant
+from tests.factories import GoalFactory, UserFactory, BoardParticipantFactory, CategoryFactory, CommentFactory
+
+URL = '/goals/sync'
+
+
+def sync(client, cursor=None, **params):
+    if cursor:
+        params["cursor"] = cursor
+    response = client.get(URL, params)
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def ids(data, section):
+    return [item["id"] for item in data[section]]
+
+
+@pytest.fixture(autouse=True)
+def no_lag():
+    with override_settings(GOALS_SYNC_LAG=0):
+        yield
+
+
+@pytest.mark.django_db
+def test_initial_and_incremental(auth_client, board, board_participant, goal_category, goal, goal_comment):
+    first = sync(auth_client)
+    assert ids(first, "boards") == [board.id]
+    assert ids(first, "participants") == [board_participant.id]
+    assert ids(first, "categories") == [goal_category.id]
+    assert ids(first, "goals") == [goal.id]
+    assert ids(first, "comments") == [goal_comment.id]
+    assert first["has_more"] is False
+
+    second = sync(auth_client, first["cursor"])
+    assert all(second[section] == [] for section in ("boards", "participants", "categories", "goals", "comments"))
+
+    auth_client.patch(f"/goals/goal/{goal.pk}", json.dumps({"title": "new"}), content_type="application/json")
+    third = sync(auth_client, second["cursor"])
+    assert [item["title"] for item in third["goals"]] == ["new"]
+    assert third["categories"] == []
+
+
+@pytest.mark.django_db
+def test_tombstones(auth_client, user, board, board_participant, goal_category, goal_comment):
+    member = UserFactory()
+    participant = BoardParticipantFactory(board=board, user=member, role=BoardParticipant.Role.writer)
+    member_client = Client()
+    member_client.force_login(member)
+    owner_cursor = sync(auth_client)["cursor"]
+    member_cursor = sync(member_client)["cursor"]
+
+    auth_client.delete(f"/goals/goal_comment/{goal_comment.pk}")
+    auth_client.put(
+        f"/goals/board/{board.pk}",
+        json.dumps({"title": board.title, "participants": []}),
+        content_type="application/json",
+    )
+    auth_client.delete(f"/goals/goal_category/{goal_category.pk}")
+
+    deleted = sync(auth_client, owner_cursor)["deleted"]
+    assert [item["id"] for item in deleted["comments"]] == [goal_comment.id]
+    assert [item["id"] for item in deleted["participants"]] == [participant.id]
+    assert [item["id"] for item in deleted["categories"]] == [goal_category.id]
+
+    member_data = sync(member_client, member_cursor)
+    assert [item["id"] for item in member_data["deleted"]["boards"]] == [board.id]
+    assert member_data["goals"] == []
+
+
+@pytest.mark.django_db
+def test_pages_through_equal_timestamps(auth_client, goal_category, board_participant):
+    goals = GoalFactory.create_batch(5, category=goal_category)
+    auth_client.patch(
+        "/goals/goal/bulk_archive",
+        json.dumps({"ids": [goal.id for goal in goals]}),
+        content_type="application/json",
+    )
+
+    seen, cursor, has_more = [], None, True
+    while has_more:
+        data = sync(auth_client, cursor, limit=2)
+        seen += ids(data, "goals")
+        cursor, has_more = data["cursor"], data["has_more"]
+    assert seen == [goal.id for goal in goals]
+
+
+@pytest.mark.django_db
+def test_cursor_of_other_user(auth_client, user_factory):
+    other = Client()
+    other.force_login(user_factory())
+    cursor = sync(other)["cursor"]
+
+    response = auth_client.get(URL, {"cursor": cursor})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def synced_member():
+    """
+    Пользователь со своей доской: после первой синхронизации у всех разделов курсора есть позиции
+    """
+    member = UserFactory()
+    own = BoardParticipantFactory(user=member)
+    CommentFactory(goal=GoalFactory(category=CategoryFactory(board=own.board, user=member), user=member), user=member)
+    member_client = Client()
+    member_client.force_login(member)
+    return member_client, member
+
+
+@pytest.mark.django_db
+def test_shared_board_sent_in_full(auth_client, user, board, board_participant, goal_category, goal, goal_comment):
+    member_client, member = synced_member()
+    cursor = sync(member_client)["cursor"]
+
+    auth_client.put(
+        f"/goals/board/{board.pk}",
+        json.dumps({"title": board.title, "participants": [{"user": member.username, "role": 3}]}),
+        content_type="application/json",
+    )
+    data = sync(member_client, cursor)
+    assert ids(data, "boards") == [board.id]
+    assert sorted(item["user"] for item in data["participants"]) == sorted([user.username, member.username])
+    assert ids(data, "categories") == [goal_category.id]
+    assert ids(data, "goals") == [goal.id]
+    assert ids(data, "comments") == [goal_comment.id]
+
+    data = sync(member_client, data["cursor"])
+    assert all(data[section] == [] for section in ("boards", "participants", "categories", "goals", "comments"))
+
+
+@pytest.mark.django_db
+def test_shared_board_paged(auth_client, board, board_participant, goal_category):
+    goals = GoalFactory.create_batch(5, category=goal_category)
+    member_client, member = synced_member()
+    cursor = sync(member_client)["cursor"]
+    BoardParticipantFactory(board=board, user=member, role=BoardParticipant.Role.reader)
+
+    seen, has_more = [], True
+    while has_more:
+        data = sync(member_client, cursor, limit=2)
+        seen += ids(data, "goals")
+        cursor, has_more = data["cursor"], data["has_more"]
+    assert sorted(set(seen)) == [goal.id for goal in goals]
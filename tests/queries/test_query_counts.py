@@ -0,0 +1,74 @@
+import pytest
+
+from goals.models import BoardParticipant
+from tests.factories import GoalFactory, CommentFactory, CategoryFactory, BoardParticipantFactory, BoardFactory
+from tests.utils import assert_fixed_queries
+
+pytestmark = pytest.mark.usefixtures("no_response_cache")
+
+# сессия и пользователь
+AUTH = 2
+# агрегат для ETag списка
+ETAG = 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("data, expected", [
+    (None, AUTH + ETAG + 1),
+    ({"limit": 100}, AUTH + ETAG + 2),
+    ({"pagination": "cursor", "limit": 100}, AUTH + ETAG + 1),
+], ids=["plain", "limit", "cursor"])
+def test_goal_list(auth_client, goal, goal_category, board_participant, data, expected):
+    assert_fixed_queries(
+        auth_client, "/goals/goal/list", expected,
+        lambda: GoalFactory.create_batch(10, category=goal_category),
+        data,
+    )
+
+
+@pytest.mark.django_db
+def test_goal_retrieve(auth_client, goal, board_participant):
+    assert_fixed_queries(auth_client, f"/goals/goal/{goal.pk}", AUTH + 1, lambda: None)
+
+
+@pytest.mark.django_db
+def test_category_list(auth_client, board, board_participant):
+    assert_fixed_queries(
+        auth_client, "/goals/goal_category/list", AUTH + ETAG + 1,
+        lambda: CategoryFactory.create_batch(10, board=board),
+    )
+
+
+@pytest.mark.django_db
+def test_category_retrieve(auth_client, goal_category, board_participant):
+    assert_fixed_queries(auth_client, f"/goals/goal_category/{goal_category.pk}", AUTH + 1, lambda: None)
+
+
+@pytest.mark.django_db
+def test_comment_list(auth_client, goal, board_participant):
+    assert_fixed_queries(
+        auth_client, "/goals/goal_comment/list", AUTH + ETAG + 2,
+        lambda: CommentFactory.create_batch(10, goal=goal),
+        {"goal": goal.pk},
+    )
+
+
+@pytest.mark.django_db
+def test_comment_retrieve(auth_client, goal_comment, board_participant):
+    assert_fixed_queries(auth_client, f"/goals/goal_comment/{goal_comment.pk}", AUTH + 1, lambda: None)
+
+
+@pytest.mark.django_db
+def test_board_list(auth_client, user, board_participant):
+    assert_fixed_queries(
+        auth_client, "/goals/board/list", AUTH + ETAG + 1,
+        lambda: [BoardParticipantFactory(board=BoardFactory(), user=user) for _ in range(10)],
+    )
+
+
+@pytest.mark.django_db
+def test_board_retrieve(auth_client, board, board_participant):
+    assert_fixed_queries(
+        auth_client, f"/goals/board/{board.pk}", AUTH + 2,
+        lambda: BoardParticipantFactory.create_batch(10, board=board, role=BoardParticipant.Role.reader),
+    )
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+from rest_framework import status
+
+from tests.utils import count_queries
+
+# сессия и пользователь
+AUTH = 2
+
+
+@pytest.mark.django_db
+def test_goal_create(auth_client, goal_category, board_participant):
+    response, queries = count_queries(
+        auth_client, "/goals/goal/create", {"title": "new", "category": goal_category.pk}, method="post",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    # категория, роли, вставка и новый счетчик (обновление, затем вставка в точке сохранения)
+    assert queries == AUTH + 7
+
+
+@pytest.mark.django_db
+def test_goal_update(auth_client, goal, board_participant):
+    response, queries = count_queries(
+        auth_client, f"/goals/goal/{goal.pk}", json.dumps({"title": "new", "category": goal.category_id}),
+        method="patch", content_type="application/json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    # цель, роли, категория, ключ счетчика под блокировкой, обновление
+    assert queries == AUTH + 5
+
+
+@pytest.mark.django_db
+def test_category_create(auth_client, board, board_participant):
+    response, queries = count_queries(
+        auth_client, "/goals/goal_category/create", {"title": "new", "board": board.pk}, method="post",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    # доска, роли, вставка
+    assert queries == AUTH + 3
+
+
+@pytest.mark.django_db
+def test_comment_create(auth_client, goal, board_participant):
+    response, queries = count_queries(
+        auth_client, "/goals/goal_comment/create", {"text": "new", "goal": goal.pk}, method="post",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    # цель, роли, вставка
+    assert queries == AUTH + 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("board_participant__role", [3], ids=["reader"])
+def test_reader_cannot_write(auth_client, goal, board_participant, board_participant__role):
+    response = auth_client.post("/goals/goal/create", {"title": "new", "category": goal.category_id})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = auth_client.patch(
+        f"/goals/goal/{goal.pk}", json.dumps({"title": "new"}), content_type="application/json",
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
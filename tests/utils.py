@@ -0,0 +1,26 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(client, url, data=None, method="get", **extra):
+    """
+    Выполняет запрос и возвращает ответ и количество запросов к базе
+    """
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data, **extra)
+    return response, len(context.captured_queries)
+
+
+def assert_fixed_queries(client, url, expected, grow, data=None):
+    """
+    Проверяет, что число запросов к базе равно expected и не меняется
+    после вызова grow(), добавляющего данных в ответ. Первый запрос прогревает кэш
+    """
+    client.get(url, data)
+    response, before = count_queries(client, url, data)
+    assert response.status_code == 200, response.content
+    grow()
+    response, after = count_queries(client, url, data)
+    assert response.status_code == 200, response.content
+    assert (before, after) == (expected, expected), f"запросов: {before} и {after}, ожидалось {expected}"
+    return response